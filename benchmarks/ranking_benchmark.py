@@ -0,0 +1,85 @@
+"""
+Benchmark of candidate ranking, full sort vs per-quality bounded heaps.
+
+Usage: python -m benchmarks.ranking_benchmark [count]
+"""
+import random
+import sys
+import time
+
+from loguru import logger
+
+from stream_fusion.utils.detection import detect_languages
+from stream_fusion.utils.filter.language_priority_filter import LanguagePriorityFilter
+from stream_fusion.utils.filter.ranking import ranking_key, top_n
+from stream_fusion.utils.filter.results_per_quality_filter import ResultsPerQualityFilter
+from stream_fusion.utils.filter_results import sort_items
+from stream_fusion.utils.parser.title_parser import parse_title
+from stream_fusion.utils.torrent.torrent_item import TorrentItem
+
+TITLES = ["The.Matrix", "Matrix", "The.Matrix.Reloaded", "Inception", "Matrix.Resurrections"]
+YEARS = ["1999", "2000", "2003", "2021", ""]
+RESOLUTIONS = ["2160p", "1080p", "720p", "480p", ""]
+TAGS = ["MULTi", "VFF", "TRUEFRENCH", "VOSTFR", "FRENCH", "VF2", "ENG", ""]
+QUALITIES = ["BluRay", "WEB-DL", "WEBRip", "HDTV", "CAM", "REMUX", ""]
+CODECS = ["x264", "x265", "HEVC", ""]
+GROUPS = ["QTZ", "FW", "SUPPLY", "KFL", "Choco", "SCENE"]
+INDEXERS = ["DMM - API", "Jackett", "Sharewood - API", "Public - Cache"]
+
+CONFIG = {
+    "languages": ["fr", "multi"],
+    "sort": "quality",
+    "resultsPerQuality": 5,
+    "maxResults": 10,
+}
+
+
+def generate_items(count: int, seed: int = 42):
+    rnd = random.Random(seed)
+    items = []
+    for _ in range(count):
+        parts = [rnd.choice(TITLES), rnd.choice(YEARS), rnd.choice(TAGS), rnd.choice(RESOLUTIONS),
+                 rnd.choice(QUALITIES), rnd.choice(CODECS)]
+        title = ".".join(part for part in parts if part) + "-" + rnd.choice(GROUPS)
+        info_hash = "%040x" % rnd.getrandbits(160)
+        magnet = f"magnet:?xt=urn:btih:{info_hash}"
+        items.append(TorrentItem(
+            title, rnd.randint(1, 80) * 1024 ** 3 // 4, magnet, info_hash, magnet, rnd.randint(0, 500),
+            detect_languages(title), rnd.choice(INDEXERS), "public", "movie", parse_title(title),
+        ))
+    return items
+
+
+def full_sort(items):
+    ranked = top_n(items, ranking_key(CONFIG["sort"]))
+    selected = ResultsPerQualityFilter(CONFIG).filter(ranked)
+    return sort_items(selected, CONFIG)[: CONFIG["maxResults"]]
+
+
+def bounded_heaps(items):
+    selected = ResultsPerQualityFilter(CONFIG).rank(items)
+    return sort_items(selected, CONFIG, limit=CONFIG["maxResults"])
+
+
+def measure(label: str, rank, items, rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = rank(list(items))
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<14} {len(items)} candidates -> {len(result)} streams in {best * 1000:.2f} ms")
+    return best, [item.info_hash for item in result]
+
+
+if __name__ == "__main__":
+    logger.remove()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    items = generate_items(count)
+    priority_filter = LanguagePriorityFilter(CONFIG)
+    for item in items:
+        item.language_priority = priority_filter.get_language_priority(item)
+
+    full, full_result = measure("full sort", full_sort, items)
+    heaps, heaps_result = measure("bounded heaps", bounded_heaps, items)
+    assert full_result == heaps_result, "Both rankings must return the same streams"
+    print(f"speedup x{full / heaps:.2f}")
@@ -10,7 +10,7 @@ NO_CACHE_HEADERS = {
     "Expires": "0",
 }
 
-EXCLUDED_TRACKERS = ['0day.kiev', '1ptbar', '2 Fast 4 You', '2xFree', '3ChangTrai', '3D Torrents', '3Wmg', '4thD',
+EXCLUDED_TRACKERS = frozenset({'0day.kiev', '1ptbar', '2 Fast 4 You', '2xFree', '3ChangTrai', '3D Torrents', '3Wmg', '4thD',
                      '52PT', '720pier', 'Abnormal', 'ABtorrents', 'Acid-Lounge', 'Across The Tasman', 'Aftershock',
                      'AGSVPT', 'Aidoru!Online', 'Aither (API)', 'AlphaRatio', 'Amigos Share Club', 'AniDUB',
                      'Anime-Free', 'AnimeBytes', 'AnimeLayer', 'AnimeTorrents', 'AnimeTorrents.ro', 'AnimeWorld (API)',
@@ -83,7 +83,7 @@ EXCLUDED_TRACKERS = ['0day.kiev', '1ptbar', '2 Fast 4 You', '2xFree', '3ChangTra
                      'White Angel', 'WinterSakura', 'World-In-HD', 'World-of-Tomorrow', 'Wukong', 'x-ite.me',
                      'XbytesV2', 'Xider-Torrent', 'XSpeeds', 'Xthor (API)', 'xTorrenty', 'Xtreme Bytes', 'XWT-Classics',
                      'XWtorrents', 'YDYPT', 'YGGcookie', 'YGGtorrent', 'Zamunda.net', 'Zelka.org', 'ZmPT (织梦)',
-                     'ZOMB', 'ZonaQ', 'Ztracker']
+                     'ZOMB', 'ZonaQ', 'Ztracker'})
 
 
 FR_RELEASE_GROUPS = [
@@ -107,15 +107,24 @@ FR_RELEASE_GROUPS = [
             r"(?<=[.\s\-\[])(USUNSKiLLED|URY|VENUE|VFC|VoMiT|Wednesday29th|ZEST|ZiRCON)(?=[.\s\-$$]|$)",
         ]
 
-FRENCH_PATTERNS = {
-    "VFF": r"\b(?:VFF|TRUEFRENCH)\b",
-    "VF2": r"\b(?:VF2)\b",
-    "VFQ": r"\b(?:VFQ)\b",
-    "VFI": r"\b(?:VFI)\b",
-    "VOF": r"\b(?:VOF)\b",
-    "VQ": r"\b(?:VOQ|VQ)\b",
-    "VOSTFR": r"\b(?:VOSTFR|SUBFRENCH)\b",
-    "FRENCH": r"\b(?:FRENCH|FR)\b",
+# Whole-word tokens, matched case-insensitively (see utils/parser/title_classifier.py)
+LANGUAGE_TOKENS = {
+    "fr": ("FR", "FRENCH", "FRA", "FRE", "FRANCES", "FRANCÊS", "VF", "VFF", "VFI", "VOF", "VOFF", "VOFI",
+           "VQ", "VOQ", "TRUEFRENCH", "VOST", "VOSTFR", "SUBFRENCH"),
+    "en": ("EN", "ENG", "ENGLISH", "VOST", "VOSTEN", "SUBBED"),
+    "multi": ("MULTI", "MULTILANG", "MULTILANGUE", "DUAL", "DUALAUDIO", "VF2"),
+}
+
+# Ordered: the first variant found in a title wins
+FRENCH_VARIANT_TOKENS = {
+    "VFF": ("VFF", "TRUEFRENCH"),
+    "VF2": ("VF2",),
+    "VFQ": ("VFQ",),
+    "VFI": ("VFI",),
+    "VOF": ("VOF",),
+    "VQ": ("VOQ", "VQ"),
+    "VOSTFR": ("VOSTFR", "SUBFRENCH"),
+    "FRENCH": ("FRENCH", "FR"),
 }
 
 class CustomException(Exception):
@@ -1,8 +1,8 @@
 import uuid
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from fastapi import Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 
@@ -15,6 +15,7 @@ from stream_fusion.services.postgresql.schemas import (
     APIKeyInDB,
 )
 from stream_fusion.utils.general import datetime_to_timestamp, timestamp_to_datetime
+from stream_fusion.services.redis.api_key_cache import invalidate_api_key
 
 class APIKeyDAO:
     """Class for accessing API key table."""
@@ -159,6 +160,7 @@ class APIKeyDAO:
 
             await self.session.commit()
             await self.session.refresh(db_key)
+            await invalidate_api_key(api_key)
 
             logger.info(f"Updated API key: {api_key}")
             return APIKeyInDB(
@@ -188,6 +190,7 @@ class APIKeyDAO:
             if db_key:
                 await self.session.delete(db_key)
                 await self.session.commit()
+                await invalidate_api_key(api_key)
                 logger.info(f"Deleted API key: {api_key}")
                 return True
             else:
@@ -227,6 +230,52 @@ class APIKeyDAO:
                 logger.error(f"Error checking API key {api_key}: {str(e)}")
                 return False
 
+    async def get_key_state(self, api_key: uuid.UUID) -> Optional[dict]:
+        """Validity and playback fields of a key, read without recording usage."""
+        query = select(
+            APIKeyModel.is_active,
+            APIKeyModel.never_expire,
+            APIKeyModel.expiration_date,
+            APIKeyModel.proxied_links,
+        ).where(APIKeyModel.api_key == str(api_key))
+        result = await self.session.execute(query)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return {
+            "is_active": row.is_active,
+            "never_expire": row.never_expire,
+            "expiration_date": row.expiration_date,
+            "proxied_links": row.proxied_links,
+        }
+
+    async def add_usage(self, usage: Dict[str, Tuple[int, int]]) -> None:
+        """Applies batched usage, {api_key: (query count, latest query timestamp)}, in one statement."""
+        table = APIKeyModel.__table__
+        statement = (
+            update(table)
+            .where(table.c.api_key == bindparam("b_api_key"))
+            .values(
+                total_queries=table.c.total_queries + bindparam("b_queries"),
+                latest_query_date=func.greatest(
+                    func.coalesce(table.c.latest_query_date, 0), bindparam("b_latest")
+                ),
+            )
+        )
+        try:
+            await self.session.execute(
+                statement,
+                [
+                    {"b_api_key": uuid.UUID(api_key), "b_queries": queries, "b_latest": latest}
+                    for api_key, (queries, latest) in usage.items()
+                ],
+            )
+            await self.session.commit()
+            logger.debug(f"Recorded batched usage for {len(usage)} API keys")
+        except Exception:
+            await self.session.rollback()
+            raise
+
     async def record_query(self, api_key: uuid.UUID) -> None:
         async with self.session.begin():
             try:
@@ -0,0 +1,79 @@
+import secrets
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from stream_fusion.services.postgresql.dependencies import get_db_session
+from stream_fusion.services.postgresql.models.config_profile_model import ConfigProfileModel
+from stream_fusion.logging_config import logger
+from stream_fusion.utils.parse_config import config_fingerprint
+
+
+class ConfigProfileDAO:
+    """Class for accessing config profile table."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+        self.session = session
+
+    async def get_profile(self, profile_id: str) -> Optional[ConfigProfileModel]:
+        try:
+            query = select(ConfigProfileModel).where(ConfigProfileModel.profile_id == profile_id)
+            result = await self.session.execute(query)
+            return result.scalar_one_or_none()
+        except Exception as e:
+            logger.error(f"Error retrieving config profile {profile_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def save_profile(
+        self, api_key: uuid.UUID, config: dict, profile_id: Optional[str] = None
+    ) -> ConfigProfileModel:
+        """Creates a profile, or replaces the config of an existing one owned by the same API key."""
+        try:
+            profile = await self.get_profile(profile_id) if profile_id else None
+            if profile_id and profile is None:
+                raise HTTPException(status_code=404, detail="Config profile not found")
+
+            if profile is None:
+                profile = ConfigProfileModel(
+                    profile_id=secrets.token_urlsafe(12),
+                    api_key=api_key,
+                    config=config,
+                    fingerprint=config_fingerprint(config),
+                )
+                self.session.add(profile)
+            else:
+                if profile.api_key != api_key:
+                    logger.warning(f"Config profile {profile_id} update refused: API key mismatch")
+                    raise HTTPException(status_code=403, detail="Config profile belongs to another API key")
+                profile.config = config
+                profile.fingerprint = config_fingerprint(config)
+                profile.updated_at = int(datetime.now().timestamp())
+
+            await self.session.commit()
+            logger.info(f"Saved config profile {profile.profile_id} for API key: {api_key}")
+            return profile
+        except HTTPException:
+            raise
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error saving config profile: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def delete_profile(self, profile_id: str, api_key: uuid.UUID) -> bool:
+        try:
+            profile = await self.get_profile(profile_id)
+            if profile is None or profile.api_key != api_key:
+                logger.warning(f"Config profile not found for deletion: {profile_id}")
+                return False
+            await self.session.delete(profile)
+            await self.session.commit()
+            logger.info(f"Deleted config profile: {profile_id}")
+            return True
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error deleting config profile {profile_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
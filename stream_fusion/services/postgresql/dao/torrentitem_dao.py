@@ -68,7 +68,7 @@ class TorrentItemDAO:
                     return None
 
                 # Update fields
-                for key, value in torrent_item.__dict__.items():
+                for key, value in TorrentItemModel.columns_from_torrent_item(torrent_item).items():
                     setattr(db_item, key, value)
 
                 db_item.updated_at = int(datetime.now(timezone.utc).timestamp())
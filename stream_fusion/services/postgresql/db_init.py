@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from .base import Base
 from .models.apikey_model import APIKeyModel
+from .models.config_profile_model import ConfigProfileModel
 from stream_fusion.settings import settings
 
 async def init_db():
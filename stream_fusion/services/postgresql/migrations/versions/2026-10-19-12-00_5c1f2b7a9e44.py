@@ -0,0 +1,33 @@
+"""config-profiles
+
+Revision ID: 5c1f2b7a9e44
+Revises: df288f2cf1fa
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5c1f2b7a9e44'
+down_revision = 'df288f2cf1fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('config_profiles',
+    sa.Column('profile_id', sa.String(length=32), nullable=False),
+    sa.Column('api_key', sa.UUID(), nullable=False),
+    sa.Column('config', sa.JSON(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=16), nullable=False),
+    sa.Column('created_at', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('profile_id')
+    )
+    op.create_index(op.f('ix_config_profiles_api_key'), 'config_profiles', ['api_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_config_profiles_api_key'), table_name='config_profiles')
+    op.drop_table('config_profiles')
@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from stream_fusion.services.postgresql.base import Base
+from datetime import datetime
+import uuid
+
+
+class ConfigProfileModel(Base):
+    """Model for user configs stored server-side and referenced by a short profile id."""
+
+    __tablename__ = "config_profiles"
+
+    profile_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    api_key: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), index=True, nullable=False)
+    config: Mapped[dict] = mapped_column(JSON, nullable=False)
+    fingerprint: Mapped[str] = mapped_column(String(16), nullable=False)
+    created_at: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        current_time = int(datetime.now().timestamp())
+        if 'created_at' not in kwargs:
+            self.created_at = current_time
+        if 'updated_at' not in kwargs:
+            self.updated_at = current_time
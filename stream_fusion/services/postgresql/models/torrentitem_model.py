@@ -60,34 +60,40 @@ class TorrentItemModel(Base):
             self.updated_at = current_time
 
     @classmethod
-    def from_torrent_item(cls, torrent_item: TorrentItem):
+    def columns_from_torrent_item(cls, torrent_item: TorrentItem) -> dict:
         model_dict = {}
-        for attr, value in torrent_item.__dict__.items():
-            if hasattr(cls, attr):
-                if attr == 'size':
-                    model_dict[attr] = cls._parse_size(value)
-                elif attr in ['files', 'full_index']:
-                    model_dict[attr] = cls._parse_json(value)
-                elif attr == 'parsed_data':
-                    model_dict[attr] = value.model_dump() if value else None
-                elif attr == "availability":
-                    model_dict[attr] = False
-                elif attr == "seeders":
-                    model_dict[attr] = int(value) if value else 0
-                else:
-                    model_dict[attr] = value
+        for attr in cls.__table__.columns.keys():
+            if attr in ['id', 'created_at', 'updated_at'] or not hasattr(torrent_item, attr):
+                continue
+            value = getattr(torrent_item, attr)
+            if attr == 'size':
+                model_dict[attr] = cls._parse_size(value)
+            elif attr in ['files', 'full_index']:
+                model_dict[attr] = cls._parse_json(value)
+            elif attr == 'parsed_data':
+                model_dict[attr] = value.to_dict() if value else None
+            elif attr == "availability":
+                model_dict[attr] = False
+            elif attr == "seeders":
+                model_dict[attr] = int(value) if value else 0
+            else:
+                model_dict[attr] = value
+        return model_dict
 
-        return cls(**model_dict)
+    @classmethod
+    def from_torrent_item(cls, torrent_item: TorrentItem):
+        return cls(**cls.columns_from_torrent_item(torrent_item))
 
     def to_torrent_item(self):
-        from RTN.models import ParsedData
+        from stream_fusion.utils.torrent.compact_parsed_data import CompactParsedData
         from stream_fusion.utils.torrent.torrent_item import TorrentItem
 
         torrent_item_dict = {}
         for attr, value in self.__dict__.items():
             if attr not in ['_sa_instance_state', 'created_at', 'updated_at']:
                 if attr == 'parsed_data':
-                    torrent_item_dict[attr] = ParsedData(**value) if value else None
+                    # Only the fields we use are kept, the full ParsedData is built on demand
+                    torrent_item_dict[attr] = CompactParsedData.from_dict(value) if value else None
                 else:
                     torrent_item_dict[attr] = value
 
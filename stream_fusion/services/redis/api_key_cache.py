@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import orjson
+from cachetools import TTLCache
+
+from stream_fusion.logging_config import logger
+from stream_fusion.services.redis.invalidation import publish_invalidation, register_invalidation_handler
+from stream_fusion.services.redis.shared_client import get_shared_redis_client
+from stream_fusion.settings import settings
+from stream_fusion.utils.general import datetime_to_timestamp
+
+STATE_KEY_PREFIX = "apikey:state:"
+USAGE_QUERIES_KEY = "apikey:usage:queries"
+USAGE_LATEST_KEY = "apikey:usage:latest"
+INVALIDATION_KIND = "api_key"
+
+_local_states = TTLCache(maxsize=10000, ttl=settings.api_key_cache_ttl)
+_local_lock = threading.Lock()
+
+
+def _is_valid(state: dict | None) -> bool:
+    # Expiry is checked on every call, a cached state may outlive the key
+    if not state or not state["is_active"]:
+        return False
+    if state["never_expire"]:
+        return True
+    expiration_date = state["expiration_date"]
+    return expiration_date is not None and expiration_date > datetime_to_timestamp(datetime.now(timezone.utc))
+
+
+def _drop_local_state(api_key: str) -> None:
+    with _local_lock:
+        _local_states.pop(api_key, None)
+
+
+register_invalidation_handler(INVALIDATION_KIND, _drop_local_state)
+
+
+async def _load_state(api_key: str, apikey_dao) -> tuple[dict | None, bool]:
+    """Key state from Redis, then Postgres. The flag is False when it could not be read."""
+    redis_key = STATE_KEY_PREFIX + api_key
+    try:
+        cached = await get_shared_redis_client().get(redis_key)
+        if cached is not None:
+            return orjson.loads(cached), True
+    except Exception as e:
+        logger.warning(f"APIKeyCache: Redis lookup failed for {api_key}: {e}")
+
+    try:
+        state = await apikey_dao.get_key_state(uuid.UUID(api_key))
+    except Exception as e:
+        logger.error(f"APIKeyCache: Error checking API key {api_key}: {e}")
+        return None, False
+
+    try:
+        await get_shared_redis_client().set(redis_key, orjson.dumps(state), ex=settings.api_key_cache_ttl)
+    except Exception as e:
+        logger.warning(f"APIKeyCache: Redis store failed for {api_key}: {e}")
+    return state, True
+
+
+async def get_api_key_state(api_key: uuid.UUID, apikey_dao) -> dict | None:
+    """
+    State of a valid key from the in-process cache, then Redis, then Postgres.
+    None for unknown, revoked or expired keys.
+    """
+    key = str(api_key)
+    with _local_lock:
+        state = _local_states.get(key, _local_states)
+    if state is _local_states:
+        state, loaded = await _load_state(key, apikey_dao)
+        if loaded:
+            # Unknown keys are cached too, as None
+            with _local_lock:
+                _local_states[key] = state
+    return state if _is_valid(state) else None
+
+
+async def is_api_key_valid(api_key: uuid.UUID, apikey_dao) -> bool:
+    return await get_api_key_state(api_key, apikey_dao) is not None
+
+
+async def record_usage(api_key: uuid.UUID) -> None:
+    """Counts one query in Redis, flush_usage() moves the counters to Postgres."""
+    key = str(api_key)
+    try:
+        pipeline = get_shared_redis_client().pipeline(transaction=True)
+        pipeline.hincrby(USAGE_QUERIES_KEY, key, 1)
+        pipeline.hset(USAGE_LATEST_KEY, key, datetime_to_timestamp(datetime.now(timezone.utc)))
+        await pipeline.execute()
+    except Exception as e:
+        logger.warning(f"APIKeyCache: Failed to record usage for {key}: {e}")
+
+
+async def invalidate_api_key(api_key: uuid.UUID) -> None:
+    """Forgets a key state everywhere, after a revocation, renewal or expiry change."""
+    key = str(api_key)
+    try:
+        await get_shared_redis_client().delete(STATE_KEY_PREFIX + key)
+    except Exception as e:
+        logger.error(f"APIKeyCache: Failed to drop {key} from Redis: {e}")
+    await publish_invalidation(INVALIDATION_KIND, key)
+
+
+async def _take_usage() -> dict:
+    """Atomically moves the pending counters out of the shared hashes."""
+    suffix = f":flush:{uuid.uuid4().hex}"
+    client = get_shared_redis_client()
+    pipeline = client.pipeline(transaction=True)
+    pipeline.rename(USAGE_QUERIES_KEY, USAGE_QUERIES_KEY + suffix)
+    pipeline.rename(USAGE_LATEST_KEY, USAGE_LATEST_KEY + suffix)
+    # A missing hash only means nothing was recorded since the last flush
+    await pipeline.execute(raise_on_error=False)
+
+    pipeline = client.pipeline(transaction=True)
+    pipeline.hgetall(USAGE_QUERIES_KEY + suffix)
+    pipeline.hgetall(USAGE_LATEST_KEY + suffix)
+    pipeline.delete(USAGE_QUERIES_KEY + suffix, USAGE_LATEST_KEY + suffix)
+    queries, latest, _ = await pipeline.execute()
+
+    now = datetime_to_timestamp(datetime.now(timezone.utc))
+    return {
+        key.decode(): (int(count), int(latest.get(key, now)))
+        for key, count in queries.items()
+    }
+
+
+async def _restore_usage(usage: dict) -> None:
+    pipeline = get_shared_redis_client().pipeline(transaction=False)
+    for key, (count, latest) in usage.items():
+        pipeline.hincrby(USAGE_QUERIES_KEY, key, count)
+        pipeline.hset(USAGE_LATEST_KEY, key, latest)
+    await pipeline.execute()
+
+
+async def flush_usage(session_factory) -> int:
+    """Writes the pending usage counters of every worker to Postgres in one batch."""
+    # Imported here, the DAO invalidates this cache on key updates
+    from stream_fusion.services.postgresql.dao.apikey_dao import APIKeyDAO
+
+    usage = await _take_usage()
+    if not usage:
+        return 0
+
+    session = session_factory()
+    try:
+        await APIKeyDAO(session).add_usage(usage)
+    except Exception as e:
+        logger.error(f"APIKeyCache: Failed to flush usage of {len(usage)} API keys, keeping it for later: {e}")
+        await _restore_usage(usage)
+        return 0
+    finally:
+        await session.close()
+    return len(usage)
+
+
+async def run_usage_flusher(session_factory) -> None:
+    """Long-running task started by the application lifespan."""
+    while True:
+        await asyncio.sleep(settings.api_key_usage_flush_interval)
+        start = time.time()
+        try:
+            flushed = await flush_usage(session_factory)
+            if flushed:
+                logger.debug(f"APIKeyCache: Flushed usage of {flushed} API keys in {time.time() - start:.2f}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"APIKeyCache: Usage flush failed: {e}")
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Callable, Dict
+
+import orjson
+
+from stream_fusion.logging_config import logger
+from stream_fusion.services.redis.shared_client import get_shared_redis_client
+
+# Every worker subscribes to this channel and drops the in-process entries named in the messages
+INVALIDATION_CHANNEL = "stream-fusion:invalidate"
+LISTEN_TIMEOUT = 30
+
+_handlers: Dict[str, Callable[[str], None]] = {}
+
+
+def register_invalidation_handler(kind: str, handler: Callable[[str], None]) -> None:
+    _handlers[kind] = handler
+
+
+def _dispatch(kind: str, key: str) -> None:
+    handler = _handlers.get(kind)
+    if handler is None:
+        logger.debug(f"Invalidation: No handler for {kind}")
+        return
+    try:
+        handler(key)
+    except Exception as e:
+        logger.error(f"Invalidation: Handler for {kind} failed on {key}: {e}")
+
+
+async def publish_invalidation(kind: str, key: str) -> None:
+    """Drops the entry in this worker right away, then in every other worker."""
+    _dispatch(kind, key)
+    try:
+        await get_shared_redis_client().publish(INVALIDATION_CHANNEL, orjson.dumps({"kind": kind, "key": key}))
+    except Exception as e:
+        logger.error(f"Invalidation: Failed to publish {kind} {key}: {e}")
+
+
+async def run_invalidation_listener() -> None:
+    """Long-running task started by the application lifespan."""
+    while True:
+        pubsub = get_shared_redis_client().pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            logger.debug("Invalidation: Listening for cache invalidations")
+            while True:
+                # Polled: the shared client's socket timeout would end a blocking listen()
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=LISTEN_TIMEOUT)
+                if message is None:
+                    continue
+                try:
+                    payload = orjson.loads(message["data"])
+                    _dispatch(payload["kind"], payload["key"])
+                except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                    logger.warning(f"Invalidation: Ignoring malformed message: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Invalidation: Listener disconnected, retrying in 5s: {e}")
+            await asyncio.sleep(5)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
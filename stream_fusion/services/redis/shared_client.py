@@ -0,0 +1,24 @@
+from redis.asyncio import Redis
+
+from stream_fusion.settings import settings
+
+_redis_client = None
+
+
+def get_shared_redis_client() -> Redis:
+    """
+    asyncio client shared by the in-process caches, rate limits and
+    invalidations of this worker. They sit on the request path and fall back
+    to local state when Redis fails, so an unreachable Redis must fail fast.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            password=settings.redis_password,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+        )
+    return _redis_client
@@ -77,6 +77,9 @@ class Settings(BaseSettings):
     use_https: bool = False
     download_service: DebridService | None = None
     no_cache_video_language: NoCacheVideoLanguages = NoCacheVideoLanguages.FR
+    config_cache_size: int = 1024  # Decoded user configs kept per worker
+    config_profiles: bool = False  # Configs stored server-side, referenced in URLs as p-<profile id>
+    config_profile_expiration: int = 86400  # Redis copy of a profile
 
     # PROXY
     proxied_link: bool = check_env_variable("RD_TOKEN") or check_env_variable(
@@ -124,7 +127,12 @@ class Settings(BaseSettings):
 
     # SECURITY
     secret_api_key: str | None = None
+    playback_tokens: bool = True  # Short /playback/{token} URLs instead of config-plus-query URLs
+    playback_token_secret: str | None = None  # Falls back to secret_api_key, tokens are disabled without either
+    playback_token_expiration: int = 86400
     security_hide_docs: bool = True
+    api_key_cache_ttl: int = 60  # Seconds a key state is reused before Postgres is asked again
+    api_key_usage_flush_interval: int = 30  # Usage counters go from Redis to Postgres in batches
     allow_anonymous_access: bool = True  # Allow access without API key
 
     # POSTGRESQL_DB
@@ -142,6 +150,26 @@ class Settings(BaseSettings):
     redis_db: int = 5
     redis_expiration: int = 604800
     redis_password: str | None = None
+    redis_socket_timeout: float = 0.2  # Shared client of the request path, see get_shared_redis_client()
+
+    # RTN PARSE CACHE
+    parse_cache_size: int = 50000
+    parse_cache_redis: bool = False
+
+    # FILTERS
+    availability_shortlist_factor: int = 0  # Debrid checks only maxResults * factor items at a time, 0 checks all
+
+    # HTTP
+    compression_min_size: int = 1024  # Smaller JSON responses are sent uncompressed
+    cache_stale_error: int = 86400  # How long clients may keep using a cached response when we fail
+    manifest_cache_max_age: int = 3600
+    debrid_timeout: int = 30  # Per call of the async debrid client
+    debrid_max_attempts: int = 5
+    debrid_backoff_max: int = 60  # Longest wait between retries, Retry-After included
+    debrid_low_priority_reserve: float = 0.2  # Share of a debrid account's quota prefetch leaves to user requests
+    debrid_availability_timeout: int = 15  # Per debrid service, slower services are left out of the results
+    debrid_availability_deadline: int = 12  # Chunked checks return partial results by then, keep it below the timeout
+    debrid_batch_window_ms: int = 5  # Concurrent availability checks on one account are merged over this window, 0 disables
 
     # TMDB
     tmdb_api_key: str | None = None
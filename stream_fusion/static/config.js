@@ -646,10 +646,29 @@ function ensureDebridConsistency() {
     updateDebridDownloaderOptions();
 }
 
+let currentProfileId = null;
+
 function loadData() {
     const currentUrl = window.location.href;
     let data = currentUrl.match(/\/([^\/]+)\/configure$/);
     let decodedData = {};
+    if (data && data[1] && data[1].startsWith('p-')) {
+        currentProfileId = data[1].slice(2);
+        fetch(`/api/profiles/${encodeURIComponent(currentProfileId)}`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Profil introuvable');
+                }
+                return response.json();
+            })
+            .then(profile => applyData(profile.config))
+            .catch(error => {
+                console.warn("No valid profile to load, using default values.", error);
+                currentProfileId = null;
+                applyData({});
+            });
+        return;
+    }
     if (data && data[1]) {
         try {
             decodedData = JSON.parse(atob(data[1]));
@@ -657,7 +676,10 @@ function loadData() {
             console.warn("No valid data to decode in URL, using default values.");
         }
     }
+    applyData(decodedData);
+}
 
+function applyData(decodedData) {
     function setElementValue(id, value, defaultValue) {
         const element = document.getElementById(id);
         if (element) {
@@ -846,8 +868,36 @@ function getLink(method) {
         return false;
     }
 
-    const encodedData = btoa(JSON.stringify(data));
-    const stremio_link = `${window.location.host}/${encodedData}/manifest.json`;
+    if (configProfilesEnabled) {
+        fetch('/api/profiles', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ config: data, profile_id: currentProfileId })
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Erreur de requête');
+                }
+                return response.json();
+            })
+            .then(profile => {
+                currentProfileId = profile.profile_id;
+                openLink(method, profile.profile_ref);
+            })
+            .catch(error => {
+                console.error('Error saving config profile:', error);
+                alert('Erreur lors de l\'enregistrement du profil');
+            });
+        return false;
+    }
+
+    openLink(method, btoa(JSON.stringify(data)));
+}
+
+function openLink(method, configSegment) {
+    const stremio_link = `${window.location.host}/${configSegment}/manifest.json`;
 
     if (method === 'link') {
         window.open(`stremio://${stremio_link}`, "_blank");
@@ -0,0 +1,101 @@
+import re
+
+import orjson
+from fastapi import HTTPException, Request
+
+from stream_fusion.logging_config import logger
+from stream_fusion.services.postgresql.dao.config_profile_dao import ConfigProfileDAO
+from stream_fusion.services.postgresql.models.config_profile_model import ConfigProfileModel
+from stream_fusion.services.redis.invalidation import publish_invalidation, register_invalidation_handler
+from stream_fusion.services.redis.shared_client import get_shared_redis_client
+from stream_fusion.settings import settings
+from stream_fusion.utils.parse_config import ParsedConfig, config_cache, parse_config
+
+# base64 never contains "-", so a profile reference cannot be mistaken for an encoded config
+PROFILE_PATTERN = re.compile(r"^p-(?P<profile_id>[A-Za-z0-9_-]{16})$")
+PROFILE_KEY_PREFIX = "config:profile:"
+INVALIDATION_KIND = "config_profile"
+
+
+
+def profile_ref(profile_id: str) -> str:
+    """URL segment used in place of the base64 config."""
+    return f"p-{profile_id}"
+
+
+def _invalidate_profile(profile_id: str) -> None:
+    config_cache.invalidate(profile_ref(profile_id))
+
+
+register_invalidation_handler(INVALIDATION_KIND, _invalidate_profile)
+
+
+async def _load_profile_config(profile_id: str, request: Request) -> dict | None:
+    key = PROFILE_KEY_PREFIX + profile_id
+    try:
+        cached = await get_shared_redis_client().get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"ConfigProfiles: Redis lookup failed for {profile_id}: {e}")
+
+    session = request.app.state.db_session_factory()
+    try:
+        profile = await ConfigProfileDAO(session).get_profile(profile_id)
+    finally:
+        await session.close()
+    if profile is None:
+        return None
+
+    try:
+        await get_shared_redis_client().set(key, orjson.dumps(profile.config), ex=settings.config_profile_expiration)
+    except Exception as e:
+        logger.warning(f"ConfigProfiles: Redis store failed for {profile_id}: {e}")
+    return profile.config
+
+
+async def resolve_config(config: str, request: Request) -> ParsedConfig:
+    """
+    Config of a request, from the base64 config string or from a profile
+    reference, looked up in-process, then in Redis, then in Postgres.
+    """
+    match = PROFILE_PATTERN.match(config)
+    if match is None:
+        return parse_config(config)
+    if not settings.config_profiles:
+        raise HTTPException(status_code=404, detail="Config profiles are disabled")
+
+    parsed = config_cache.lookup(config)
+    if parsed is not None:
+        return parsed
+
+    profile_id = match.group("profile_id")
+    profile_config = await _load_profile_config(profile_id, request)
+    if profile_config is None:
+        logger.warning(f"ConfigProfiles: Unknown profile {profile_id}")
+        raise HTTPException(status_code=404, detail="Config profile not found")
+
+    parsed = ParsedConfig(profile_config)
+    config_cache.store(config, parsed)
+    return parsed
+
+
+async def publish_profile(profile: ConfigProfileModel) -> None:
+    """Makes an edited profile visible to every worker immediately."""
+    try:
+        await get_shared_redis_client().set(
+            PROFILE_KEY_PREFIX + profile.profile_id,
+            orjson.dumps(profile.config),
+            ex=settings.config_profile_expiration,
+        )
+    except Exception as e:
+        logger.error(f"ConfigProfiles: Failed to refresh {profile.profile_id} in Redis: {e}")
+    await publish_invalidation(INVALIDATION_KIND, profile.profile_id)
+
+
+async def drop_profile(profile_id: str) -> None:
+    try:
+        await get_shared_redis_client().delete(PROFILE_KEY_PREFIX + profile_id)
+    except Exception as e:
+        logger.error(f"ConfigProfiles: Failed to drop {profile_id} from Redis: {e}")
+    await publish_invalidation(INVALIDATION_KIND, profile_id)
@@ -16,6 +16,9 @@ class AllDebrid(BaseDebrid):
         self.base_url = f"{settings.ad_base_url}/{settings.ad_api_version}/"
         self.agent = settings.ad_user_app
 
+    def _account_token(self):
+        return settings.ad_token if settings.ad_unique_account else self.config.get("ADToken")
+
     def get_headers(self):
         if settings.ad_unique_account:
             if not settings.proxied_link:
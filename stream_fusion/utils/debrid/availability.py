@@ -0,0 +1,211 @@
+import asyncio
+import contextvars
+import threading
+
+from cachetools import LRUCache
+
+from stream_fusion.logging_config import logger
+from stream_fusion.settings import settings
+from stream_fusion.utils.debrid.base_debrid import BaseDebrid
+from stream_fusion.utils.debrid.rate_limit import QuotaLow, backoff_delay, current_low_priority_work, low_priority
+
+
+async def _check_service(debrid: BaseDebrid, hashes: list, ip: str | None):
+    name = type(debrid).__name__
+    timeout = settings.debrid_availability_timeout
+    try:
+        return debrid, await asyncio.wait_for(debrid.get_availability_bulk_async(hashes, ip), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Availability: {name} did not answer within {timeout}s, skipping it")
+    except QuotaLow:
+        logger.debug(f"Availability: {name} skipped, quota kept for user requests")
+    except Exception as e:
+        logger.error(f"Availability: {name} check failed: {e}")
+    return debrid, None
+
+
+async def check_availability(debrid_services, torrent_smart_container, shortlist, media, ip=None) -> None:
+    """
+    Asks every debrid service about the shortlist at once. Answers are merged
+    in the order of the services, each as soon as the ones before it are in,
+    so an item available on several services always plays from the first one.
+    A service that times out or fails only loses its own results.
+    """
+    hashes = torrent_smart_container.get_unaviable_hashes(shortlist)
+    if not hashes:
+        return
+
+    checks = [asyncio.ensure_future(_check_service(debrid, hashes, ip)) for debrid in debrid_services]
+    try:
+        for check in checks:
+            debrid, result = await check
+            name = type(debrid).__name__
+            if not result:
+                logger.warning(f"Availability: No availability results found with {name}")
+                continue
+            try:
+                torrent_smart_container.update_availability(result, type(debrid), media)
+            except Exception as e:
+                logger.error(f"Availability: Failed to merge {name} results: {e}")
+                continue
+            logger.info(f"Availability: Checked availability for {len(result)} items with {name}")
+    finally:
+        # Only left running when the request itself was cancelled
+        for check in checks:
+            check.cancel()
+
+
+class ChunkError(Exception):
+    """A chunk the provider did not answer, retried on its own."""
+
+    def __init__(self, message: str, retry_after: str | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+async def check_in_chunks(name: str, hashes: list, check_chunk, chunk_size: int, concurrency: int, deadline: float) -> list:
+    """
+    Availability of many hashes through an API answering a few at a time.
+    Chunks run concurrently, at most concurrency at once, check_chunk()
+    applying the provider's rate limit. A failed chunk is retried alone, and
+    whatever came back by the deadline is returned.
+    """
+    chunks = [hashes[i:i + chunk_size] for i in range(0, len(hashes), chunk_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    max_attempts = settings.debrid_max_attempts
+    results = []
+
+    async def run(chunk):
+        for attempt in range(max_attempts):
+            async with semaphore:
+                try:
+                    results.extend(await check_chunk(chunk))
+                    return
+                except QuotaLow:
+                    return
+                except Exception as e:
+                    retry_after = getattr(e, "retry_after", None)
+                    logger.warning(f"Availability: {name} chunk failed, attempt {attempt + 1}/{max_attempts}: {e}")
+            if attempt < max_attempts - 1:
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+        logger.error(f"Availability: {name} chunk of {len(chunk)} hashes failed {max_attempts} times, giving up")
+
+    tasks = [asyncio.ensure_future(run(chunk)) for chunk in chunks]
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+    finally:
+        for task in tasks:
+            task.cancel()
+    if pending:
+        logger.warning(
+            f"Availability: {name} answered {len(tasks) - len(pending)}/{len(tasks)} chunks within {deadline}s, returning partial results"
+        )
+    return results
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # A batch failing after every caller left would log "Future exception was never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+class _Batch:
+    def __init__(self, loop):
+        self.hashes = {}  # Insertion ordered set
+        self.future = loop.create_future()
+        self.future.add_done_callback(_retrieve_exception)
+        self.waiters = 0
+        self.low_priority = True
+        self.yielded = False
+        self.task = None
+
+
+class AvailabilityBatcher:
+    """
+    Merges the availability lookups concurrent requests make on one account.
+    Hashes are collected for a short window and checked once, each caller
+    gets back the items of its own hashes. Callers keep their own timeout:
+    one leaving does not cancel the check, the last one leaving does.
+    The batch runs the fetch of the caller that opened it, so every caller
+    of a batcher must pass an equivalent one, see get_batcher().
+    """
+
+    def __init__(self, name: str, window: float):
+        self.name = name
+        self.window = window
+        self._open = None
+
+    async def check(self, hashes: list, fetch) -> list:
+        """fetch(hashes) returns items carrying their hash under "hash"."""
+        hashes = list(dict.fromkeys(hashes))
+        batch = self._open
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = self._open = _Batch(loop)
+            loop.call_later(self.window, self._dispatch, batch, fetch)
+        batch.hashes.update(dict.fromkeys(hashes))
+        work = current_low_priority_work()
+        if work is None:
+            batch.low_priority = False
+
+        batch.waiters += 1
+        try:
+            items = await asyncio.shield(batch.future)
+        finally:
+            batch.waiters -= 1
+            if batch.waiters == 0 and batch.task is not None and not batch.task.done():
+                logger.debug(f"Availability: {self.name} batch abandoned by every request, cancelling it")
+                batch.task.cancel()
+
+        if batch.yielded and work is not None:
+            work.yielded = True
+        return [item for info_hash in hashes for item in items.get(info_hash, ())]
+
+    def _dispatch(self, batch: _Batch, fetch) -> None:
+        if self._open is batch:
+            self._open = None
+        if batch.waiters == 0:
+            batch.future.cancel()
+            return
+        # Own context, the low priority state of the first caller must not apply to the others
+        batch.task = asyncio.get_running_loop().create_task(self._run(batch, fetch), context=contextvars.Context())
+
+    async def _run(self, batch: _Batch, fetch) -> None:
+        hashes = list(batch.hashes)
+        logger.debug(f"Availability: {self.name} checking {len(hashes)} hashes for {batch.waiters} requests")
+        try:
+            if batch.low_priority:
+                with low_priority() as work:
+                    items = await fetch(hashes)
+                batch.yielded = work.yielded
+            else:
+                items = await fetch(hashes)
+        except asyncio.CancelledError:
+            batch.future.cancel()
+            raise
+        except Exception as e:
+            batch.future.set_exception(e)
+            return
+
+        items_by_hash = {}
+        for item in items:
+            items_by_hash.setdefault(item["hash"], []).append(item)
+        batch.future.set_result(items_by_hash)
+
+
+_batchers = LRUCache(maxsize=10000)
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(provider: str, account: str, ip: str | None = None) -> AvailabilityBatcher:
+    """
+    Batcher shared by the requests of an account from one client IP, within
+    this worker. The IP is part of the lookup, requests from other IPs get
+    their own batches.
+    """
+    name = f"{provider}:{account}:{ip or ''}"
+    with _batchers_lock:
+        batcher = _batchers.get(name)
+        if batcher is None:
+            batcher = _batchers[name] = AvailabilityBatcher(provider, settings.debrid_batch_window_ms / 1000)
+        return batcher
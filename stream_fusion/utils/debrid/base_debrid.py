@@ -1,11 +1,67 @@
-from collections import deque
+import asyncio
+import hashlib
 import json
 import time
 
+import aiohttp
 import requests
+from aiohttp_socks import ProxyConnector
 
 from stream_fusion.logging_config import logger
 from stream_fusion.settings import settings
+from stream_fusion.utils.debrid.rate_limit import (
+    SharedRateLimit,
+    TokenBucket,
+    backoff_delay,
+    quota_key,
+    record_quota,
+)
+from stream_fusion.utils.parse_config import config_fingerprint
+
+_http_session = None
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Session for debrid API calls, through the proxy when one is configured."""
+    if settings.proxy_url:
+        connector = ProxyConnector.from_url(settings.proxy_url, limit=100, limit_per_host=50)
+    else:
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=50)
+    return aiohttp.ClientSession(connector=connector)
+
+
+def set_http_session(session: aiohttp.ClientSession) -> None:
+    """Registers the application's shared session, see lifespan_setup()."""
+    global _http_session
+    _http_session = session
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        # Outside the application, e.g. in scripts
+        _http_session = create_http_session()
+    return _http_session
+
+
+def _form_data(data, files):
+    """requests-style data and files arguments for aiohttp."""
+    if isinstance(data, dict):
+        # requests leaves out None values
+        data = {key: value for key, value in data.items() if value is not None}
+    if not files:
+        return data
+
+    form = aiohttp.FormData()
+    for key, value in (data or {}).items():
+        form.add_field(key, str(value))
+    for key, value in files.items():
+        if isinstance(value, tuple):
+            filename, content, content_type = (value + (None,))[:3]
+            form.add_field(key, content, filename=filename, content_type=content_type)
+        else:
+            form.add_field(key, value)
+    return form
 
 
 class BaseDebrid:
@@ -20,8 +76,9 @@ class BaseDebrid:
         self.torrent_limit = 1
         self.torrent_period = 1
 
-        self.global_requests = deque()
-        self.torrent_requests = deque()
+        self._limits = {}
+        self._instance_buckets = {}
+        self._account = None
 
     def _create_session(self):
         session = requests.Session()
@@ -33,32 +90,76 @@ class BaseDebrid:
             }
         return session
 
-    def _rate_limit(self, requests_queue, limit, period):
-        current_time = time.time()
+    def _account_token(self):
+        """Credential the provider counts calls against, None to fall back on the config."""
+        return None
 
-        while requests_queue and requests_queue[0] <= current_time - period:
-            requests_queue.popleft()
+    @property
+    def account(self):
+        """Hash of the account, every worker and request using it shares its limits."""
+        if self._account is None:
+            token = self._account_token()
+            if token:
+                token = json.dumps(token, sort_keys=True, default=str)
+                self._account = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+            else:
+                fingerprint = getattr(self.config, "fingerprint", None)
+                self._account = fingerprint or config_fingerprint(self.config or {})
+        return self._account
 
-        if len(requests_queue) >= limit:
-            sleep_time = requests_queue[0] - (current_time - period)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+    @property
+    def provider(self):
+        return type(self).__name__
 
-        requests_queue.append(time.time())
+    def _limit(self, endpoint, limit, period):
+        rate_limit = self._limits.get(endpoint)
+        if rate_limit is None:
+            rate_limit = self._limits[endpoint] = SharedRateLimit(self.provider, self.account, endpoint, limit, period)
+        return rate_limit
+
+    @property
+    def global_limiter(self):
+        return self._limit("global", self.global_limit, self.global_period)
+
+    @property
+    def torrent_limiter(self):
+        return self._limit("torrents", self.torrent_limit, self.torrent_period)
+
+    @property
+    def quota_key(self):
+        return quota_key(self.provider, self.account)
+
+    def _instance_bucket(self, endpoint, limit, period):
+        # The blocking client sleeps on the thread it runs on, often the event loop:
+        # it only limits the calls of this instance, as it always did
+        bucket = self._instance_buckets.get(endpoint)
+        if bucket is None:
+            bucket = self._instance_buckets[endpoint] = TokenBucket(limit / period, limit)
+        return bucket
 
     def _global_rate_limit(self):
-        self._rate_limit(self.global_requests, self.global_limit, self.global_period)
+        self._instance_bucket("global", self.global_limit, self.global_period).acquire_blocking()
 
     def _torrent_rate_limit(self):
-        self._rate_limit(self.torrent_requests, self.torrent_limit, self.torrent_period)
+        self._instance_bucket("torrents", self.torrent_limit, self.torrent_period).acquire_blocking()
 
-    def json_response(self, url, method="get", data=None, headers=None, files=None):
-        self._global_rate_limit()
-        if "torrents" in url:
-            self._torrent_rate_limit()
+    async def _global_rate_limit_async(self):
+        await self.global_limiter.acquire()
 
+    async def _torrent_rate_limit_async(self):
+        await self.torrent_limiter.acquire()
+
+    def json_response(self, url, method="get", data=None, headers=None, files=None):
+        """
+        Blocking client, kept for the playback flows not migrated to
+        json_response_async() yet. Limited per instance, see _instance_bucket().
+        """
         max_attempts = 5
         for attempt in range(max_attempts):
+            self._global_rate_limit()
+            if "torrents" in url:
+                self._torrent_rate_limit()
+
             try:
                 if method == "get":
                     response = self.__session.get(url, headers=headers)
@@ -83,9 +184,9 @@ class BaseDebrid:
                         f"BaseDebrid: Response content: {response.text[:200]}..."
                     )
                     if attempt < max_attempts - 1:
-                        wait_time = 2**attempt + 1
+                        wait_time = backoff_delay(attempt)
                         self.logger.info(
-                            f"BaseDebrid: Retrying in {wait_time} seconds..."
+                            f"BaseDebrid: Retrying in {wait_time:.1f} seconds..."
                         )
                         time.sleep(wait_time)
                     else:
@@ -94,9 +195,9 @@ class BaseDebrid:
             except requests.exceptions.HTTPError as e:
                 status_code = e.response.status_code
                 if status_code == 429:
-                    wait_time = 2**attempt + 1
+                    wait_time = backoff_delay(attempt, e.response.headers.get("Retry-After"))
                     self.logger.warning(
-                        f"BaseDebrid: Rate limit exceeded. Attempt {attempt + 1}/{max_attempts}. Waiting for {wait_time} seconds."
+                        f"BaseDebrid: Rate limit exceeded. Attempt {attempt + 1}/{max_attempts}. Waiting for {wait_time:.1f} seconds."
                     )
                     time.sleep(wait_time)
                 elif 400 <= status_code < 500:
@@ -109,9 +210,9 @@ class BaseDebrid:
                         f"BaseDebrid: Server error occurred: {e}. Status code: {status_code}"
                     )
                     if attempt < max_attempts - 1:
-                        wait_time = 2**attempt + 1
+                        wait_time = backoff_delay(attempt, e.response.headers.get("Retry-After"))
                         self.logger.info(
-                            f"BaseDebrid: Retrying in {wait_time} seconds..."
+                            f"BaseDebrid: Retrying in {wait_time:.1f} seconds..."
                         )
                         time.sleep(wait_time)
                     else:
@@ -124,16 +225,16 @@ class BaseDebrid:
             except requests.exceptions.ConnectionError as e:
                 self.logger.error(f"BaseDebrid: Connection error occurred: {e}")
                 if attempt < max_attempts - 1:
-                    wait_time = 2**attempt + 1
-                    self.logger.info(f"BaseDebrid: Retrying in {wait_time} seconds...")
+                    wait_time = backoff_delay(attempt)
+                    self.logger.info(f"BaseDebrid: Retrying in {wait_time:.1f} seconds...")
                     time.sleep(wait_time)
                 else:
                     return None
             except requests.exceptions.Timeout as e:
                 self.logger.error(f"BaseDebrid: Request timed out: {e}")
                 if attempt < max_attempts - 1:
-                    wait_time = 2**attempt + 1
-                    self.logger.info(f"BaseDebrid: Retrying in {wait_time} seconds...")
+                    wait_time = backoff_delay(attempt)
+                    self.logger.info(f"BaseDebrid: Retrying in {wait_time:.1f} seconds...")
                     time.sleep(wait_time)
                 else:
                     return None
@@ -146,6 +247,65 @@ class BaseDebrid:
         )
         return None
 
+    async def json_response_async(self, url, method="get", data=None, headers=None, files=None):
+        """
+        json_response() on the shared aiohttp session: rate limits and retries
+        wait without blocking the event loop, 429 and 503 honour Retry-After.
+        """
+        if method not in ("get", "post", "put", "delete"):
+            raise ValueError(f"BaseDebrid: Unsupported HTTP method: {method}")
+
+        session = get_http_session()
+        timeout = aiohttp.ClientTimeout(total=settings.debrid_timeout)
+        max_attempts = settings.debrid_max_attempts
+        for attempt in range(max_attempts):
+            # Every attempt, retries included, goes through the shared limits
+            await self._global_rate_limit_async()
+            if "torrents" in url:
+                await self._torrent_rate_limit_async()
+
+            retry_after = None
+            try:
+                async with session.request(
+                    method, url, data=_form_data(data, files), headers=headers, timeout=timeout
+                ) as response:
+                    status_code = response.status
+                    retry_after = response.headers.get("Retry-After")
+                    content = await response.read()
+                await record_quota(self.quota_key, status_code, response.headers, self.global_period)
+
+                if status_code == 429:
+                    self.logger.warning(
+                        f"BaseDebrid: Rate limit exceeded. Attempt {attempt + 1}/{max_attempts}."
+                    )
+                elif 400 <= status_code < 500:
+                    self.logger.error(f"BaseDebrid: Client error occurred on {url}. Status code: {status_code}")
+                    return None
+                elif 500 <= status_code < 600:
+                    self.logger.error(f"BaseDebrid: Server error occurred on {url}. Status code: {status_code}")
+                else:
+                    try:
+                        return json.loads(content)
+                    except json.JSONDecodeError as json_err:
+                        self.logger.error(f"BaseDebrid: Invalid JSON response: {json_err}")
+                        self.logger.debug(f"BaseDebrid: Response content: {content[:200]}...")
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.logger.error(f"BaseDebrid: Connection error occurred: {e!r}")
+            except aiohttp.ClientError as e:
+                self.logger.error(f"BaseDebrid: An unexpected error occurred: {e!r}")
+                return None
+
+            if attempt < max_attempts - 1:
+                wait_time = backoff_delay(attempt, retry_after)
+                self.logger.info(f"BaseDebrid: Retrying in {wait_time:.1f} seconds...")
+                await asyncio.sleep(wait_time)
+
+        self.logger.error(
+            "BaseDebrid: Max attempts reached. Unable to complete request."
+        )
+        return None
+
     def wait_for_ready_status(self, check_status_func, timeout=30, interval=5):
         self.logger.info(f"BaseDebrid: Waiting for {timeout} seconds for caching.")
         start_time = time.time()
@@ -173,3 +333,7 @@ class BaseDebrid:
 
     def get_availability_bulk(self, hashes_or_magnets, ip=None):
         raise NotImplementedError
+
+    async def get_availability_bulk_async(self, hashes_or_magnets, ip=None):
+        """get_availability_bulk() in a worker thread, for services without an async client."""
+        return await asyncio.to_thread(self.get_availability_bulk, hashes_or_magnets, ip)
@@ -19,6 +19,9 @@ class Premiumize(BaseDebrid):
         # Vérifier la validité du token
         self._check_token()
 
+    def _account_token(self):
+        return self.api_key
+
     def _check_token(self):
         """Vérifier la validité du token en appelant l'API account/info"""
         url = f"{self.base_url}/account/info"
@@ -149,11 +152,6 @@ class Premiumize(BaseDebrid):
         logger.info(f"Checking availability for {len(hashes_or_magnets)} items")
         logger.debug(f"Using Premiumize API key: {self.api_key}")
         
-        # Construire l'URL avec les paramètres
-        params = []
-        for hash in hashes_or_magnets:
-            params.append(f"items[]={hash}")
-        
         url = f"{self.base_url}/cache/check"
         response = self.json_response(
             url,
@@ -164,6 +162,24 @@ class Premiumize(BaseDebrid):
             }
         )
         
+        return self._format_availability(hashes_or_magnets, response)
+
+    async def get_availability_bulk_async(self, hashes_or_magnets, ip=None):
+        if not hashes_or_magnets:
+            return {}
+
+        logger.info(f"Checking availability for {len(hashes_or_magnets)} items")
+        response = await self.json_response_async(
+            f"{self.base_url}/cache/check",
+            method='post',
+            data={
+                'apikey': self.api_key,
+                'items[]': hashes_or_magnets
+            }
+        )
+        return self._format_availability(hashes_or_magnets, response)
+
+    def _format_availability(self, hashes_or_magnets, response):
         logger.info(f"Raw Premiumize response: {response}")
 
         if not response or response.get("status") != "success":
@@ -0,0 +1,274 @@
+import asyncio
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from cachetools import LRUCache
+
+from stream_fusion.logging_config import logger
+from stream_fusion.services.redis.shared_client import get_shared_redis_client
+from stream_fusion.settings import settings
+
+
+class TokenBucket:
+    """
+    Process-local rate limit, used when Redis cannot be reached.
+    Callers reserve their token up front and sleep outside the lock, so
+    waiters are served in arrival order, from threads and coroutines alike.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token, returns how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Idle buckets are full anyway, dropping the least recently used ones loses nothing
+_buckets = LRUCache(maxsize=10000)
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(name: str, limit: int, period: float) -> TokenBucket:
+    """Bucket allowing limit calls per period, with bursts up to limit."""
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = _buckets[name] = TokenBucket(limit / period, limit)
+        return bucket
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Retry-After header in seconds, given as a delay or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds to wait after a failed attempt, the server's Retry-After first."""
+    delay = retry_after_seconds(retry_after)
+    if delay is not None:
+        return min(delay, settings.debrid_backoff_max)
+    # Jittered so the requests throttled together do not retry together
+    delay = min(settings.debrid_backoff_max, 2 ** (attempt + 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class QuotaLow(Exception):
+    """Raised to low-priority work when the account is running out of quota."""
+
+
+class LowPriorityWork:
+    def __init__(self):
+        self.yielded = False
+
+
+_low_priority_work: ContextVar[LowPriorityWork | None] = ContextVar("debrid_low_priority_work", default=None)
+
+
+@contextmanager
+def low_priority():
+    """
+    Debrid calls made inside give way to user requests when the account is
+    close to its limit, raising QuotaLow. work.yielded tells whether it happened,
+    for callers whose services swallow the exception.
+    """
+    work = LowPriorityWork()
+    token = _low_priority_work.set(work)
+    try:
+        yield work
+    finally:
+        _low_priority_work.reset(token)
+
+
+def current_low_priority_work() -> LowPriorityWork | None:
+    """The low priority work the caller runs in, None for user requests."""
+    return _low_priority_work.get()
+
+
+# KEYS[1]: sliding window log of the calls, KEYS[2]: quota reported by the provider
+# ARGV[1]: window in ms, ARGV[2]: limit, ARGV[3]: unique member,
+# ARGV[4]: 1 for low priority work, ARGV[5]: share of the quota kept for user requests
+# Returns 0 when the call may proceed, the ms to wait otherwise, -1 when low priority work must yield
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+
+if ARGV[4] == '1' then
+    local reserve = tonumber(ARGV[5])
+    if count >= limit * (1 - reserve) then
+        return -1
+    end
+    local remaining = tonumber(redis.call('HGET', KEYS[2], 'remaining'))
+    if remaining then
+        local provider_limit = tonumber(redis.call('HGET', KEYS[2], 'limit')) or limit
+        if remaining <= provider_limit * reserve then
+            return -1
+        end
+    end
+end
+
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return 0
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return math.max(tonumber(oldest[2]) + window - now, 1)
+"""
+
+_scripts = {}
+# Once Redis failed, calls are limited in-process for a while instead of waiting on it every time
+REDIS_RETRY_DELAY = 5
+_redis_retry_at = 0.0
+
+
+def _script(client):
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(SLIDING_WINDOW_SCRIPT)
+    return script
+
+
+def _redis_available() -> bool:
+    return time.monotonic() >= _redis_retry_at
+
+
+def _redis_failed(provider: str, error: Exception) -> None:
+    global _redis_retry_at
+    _redis_retry_at = time.monotonic() + REDIS_RETRY_DELAY
+    logger.warning(f"RateLimit: Redis unavailable, limiting {provider} in-process for {REDIS_RETRY_DELAY}s: {error}")
+
+
+class SharedRateLimit:
+    """
+    Sliding window limit shared by every worker through Redis, keyed by
+    provider, account and endpoint class. Falls back to the process-local
+    TokenBucket when Redis cannot be reached.
+    """
+
+    def __init__(self, provider: str, account: str, endpoint: str, limit: int, period: float):
+        self.provider = provider
+        self.limit = limit
+        self.period = period
+        self.window_key = f"debrid:ratelimit:{provider}:{account}:{endpoint}"
+        self.quota_key = quota_key(provider, account)
+        self.local_bucket = get_bucket(f"{provider}:{account}:{endpoint}", limit, period)
+
+    def _args(self, work: LowPriorityWork | None):
+        return (
+            [self.window_key, self.quota_key],
+            [int(self.period * 1000), self.limit, uuid.uuid4().hex, 1 if work else 0, settings.debrid_low_priority_reserve],
+        )
+
+    def _yield(self, work: LowPriorityWork):
+        work.yielded = True
+        logger.info(f"RateLimit: {self.provider} quota running low, low priority work yields")
+        raise QuotaLow(self.provider)
+
+    async def acquire(self) -> None:
+        work = _low_priority_work.get()
+        keys, args = self._args(work)
+        while True:
+            if not _redis_available():
+                await self.local_bucket.acquire()
+                return
+            try:
+                wait = await _script(get_shared_redis_client())(keys=keys, args=args)
+            except Exception as e:
+                _redis_failed(self.provider, e)
+                continue
+            if wait == 0:
+                return
+            if wait < 0:
+                self._yield(work)
+            await asyncio.sleep(wait / 1000)
+
+
+def quota_key(provider: str, account: str) -> str:
+    return f"debrid:quota:{provider}:{account}"
+
+
+def _header(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                return None
+    return None
+
+
+def quota_from_response(status_code: int, headers, period: float) -> tuple[dict, int] | None:
+    """Quota left on the account according to the provider, and how long it holds."""
+    if status_code == 429:
+        delay = retry_after_seconds(headers.get("Retry-After"))
+        return {"remaining": 0}, max(int(delay or period), 1)
+    remaining = _header(headers, "X-RateLimit-Remaining", "RateLimit-Remaining", "X-Ratelimit-Remaining")
+    if remaining is None:
+        return None
+    quota = {"remaining": remaining}
+    limit = _header(headers, "X-RateLimit-Limit", "RateLimit-Limit", "X-Ratelimit-Limit")
+    if limit is not None:
+        quota["limit"] = limit
+    return quota, max(int(period), 1)
+
+
+def _quota_pipeline(client, key: str, quota: dict, expiration: int):
+    pipeline = client.pipeline(transaction=True)
+    pipeline.hset(key, mapping=quota)
+    pipeline.expire(key, expiration)
+    return pipeline
+
+
+async def record_quota(key: str, status_code: int, headers, period: float) -> None:
+    quota = quota_from_response(status_code, headers, period)
+    if quota is None or not _redis_available():
+        return
+    try:
+        await _quota_pipeline(get_shared_redis_client(), key, *quota).execute()
+    except Exception as e:
+        logger.debug(f"RateLimit: Failed to record quota {key}: {e}")
@@ -1,3 +1,4 @@
+import asyncio
 import re
 import time
 from urllib.parse import unquote
@@ -23,6 +24,9 @@ class RealDebrid(BaseDebrid):
         if not settings.rd_unique_account:
             self.token_manager = RDTokenManager(config)
 
+    def _account_token(self):
+        return settings.rd_token if settings.rd_unique_account else self.config.get("RDToken")
+
     def get_headers(self):
         if settings.rd_unique_account:
             if not settings.proxied_link:
@@ -128,13 +132,21 @@ class RealDebrid(BaseDebrid):
         return None
 
     def get_availability_bulk(self, hashes_or_magnets, ip=None):
-        self._torrent_rate_limit()
         if len(hashes_or_magnets) == 0:
             logger.info("Real-Debrid: No hashes to be sent.")
             return dict()
         url = f"{self.base_url}torrents/instantAvailability/{'/'.join(hashes_or_magnets)}"
         return self.json_response(url, headers=self.get_headers())
 
+    async def get_availability_bulk_async(self, hashes_or_magnets, ip=None):
+        if len(hashes_or_magnets) == 0:
+            logger.info("Real-Debrid: No hashes to be sent.")
+            return dict()
+        url = f"{self.base_url}torrents/instantAvailability/{'/'.join(hashes_or_magnets)}"
+        # The token manager may refresh the token with a blocking call
+        headers = await asyncio.to_thread(self.get_headers)
+        return await self.json_response_async(url, headers=headers)
+
     def get_stream_link(self, query, config, ip=None):
         # Extract query parameters
         magnet = query["magnet"]
@@ -191,7 +203,6 @@ class RealDebrid(BaseDebrid):
         return unrestrict_response["download"]
 
     def _get_cached_torrent_ids(self, info_hash):
-        self._torrent_rate_limit()
         url = f"{self.base_url}torrents"
         torrents = self.json_response(url, headers=self.get_headers())
 
@@ -1,15 +1,24 @@
+import re
 import requests
 import time
 from urllib.parse import quote
 import json
 
+import aiohttp
+
 from stream_fusion.logging_config import logger
-from stream_fusion.utils.debrid.base_debrid import BaseDebrid
+from stream_fusion.utils.debrid.availability import ChunkError, check_in_chunks, get_batcher
+from stream_fusion.utils.debrid.base_debrid import BaseDebrid, get_http_session
+from stream_fusion.utils.debrid.rate_limit import record_quota
 from stream_fusion.settings import settings
 from stream_fusion.utils.general import season_episode_in_filename
 
 
 class StremThru(BaseDebrid):
+    # Magnets per /magnets/check call, and calls in flight per availability check
+    availability_chunk_size = 50
+    availability_concurrency = 4
+
     def __init__(self, config):
         super().__init__(config)
         self.config = config
@@ -56,6 +65,19 @@ class StremThru(BaseDebrid):
         self.session.headers["X-StremThru-Store-Name"] = store_name
         self.session.headers["X-StremThru-Store-Authorization"] = f"Bearer {token}"
         self.session.headers["User-Agent"] = "stream-fusion"
+        # Limits follow the store account
+        self._account = None
+        self._limits = {}
+
+    def _account_token(self):
+        return self.token
+
+    def _store_headers(self):
+        return {
+            "X-StremThru-Store-Name": self.store_name,
+            "X-StremThru-Store-Authorization": f"Bearer {self.token}",
+            "User-Agent": "stream-fusion",
+        }
         
     @staticmethod
     def get_underlying_debrid_code(store_name=None):
@@ -98,6 +120,39 @@ class StremThru(BaseDebrid):
             logger.warning(f"Exception lors de la vérification du statut premium sur StremThru-{self.store_name}: {e}")
         return False
 
+    def _check_url(self, hashes_or_magnets, ip=None):
+        magnets = []
+        for hash_or_magnet in hashes_or_magnets:
+            if not hash_or_magnet.startswith('magnet:'):
+                clean_hash = hash_or_magnet.lower()
+                if len(clean_hash) > 40:
+                    clean_hash = clean_hash[:40]
+                magnet_url = f"magnet:?xt=urn:btih:{clean_hash}"
+            else:
+                magnet_url = hash_or_magnet
+            magnets.append(magnet_url)
+
+        url = f"{self.base_url}/magnets/check?magnet={','.join([quote(m) for m in magnets])}"
+        if ip:
+            url += f"&client_ip={ip}"
+        return url
+
+    def _cached_items(self, json_data):
+        results = []
+        if json_data and "data" in json_data and "items" in json_data["data"]:
+            for item in json_data["data"]["items"]:
+                if item.get("status") == "cached":
+                    hash_value = item["hash"].lower()
+                    results.append({
+                        "hash": hash_value,
+                        "status": "cached",
+                        "files": item.get("files", []),
+                        "store_name": self.store_name,
+                        "debrid": StremThru.get_underlying_debrid_code(self.store_name)
+                    })
+                    logger.debug(f"Magnet caché trouvé sur StremThru-{self.store_name}: {hash_value}")
+        return results
+
     def get_availability_bulk(self, hashes_or_magnets, ip=None):
         """Vérifie la disponibilité des torrents avec l'API StremThru"""
         if not hashes_or_magnets:
@@ -105,51 +160,73 @@ class StremThru(BaseDebrid):
             
         results = []
         
-        chunk_size = 50
+        chunk_size = self.availability_chunk_size
         for i in range(0, len(hashes_or_magnets), chunk_size):
             chunk = hashes_or_magnets[i:i + chunk_size]
-            magnets = []
-
-            for hash_or_magnet in chunk:
-                if not hash_or_magnet.startswith('magnet:'):
-                    clean_hash = hash_or_magnet.lower()
-                    if len(clean_hash) > 40:
-                        clean_hash = clean_hash[:40]
-                    magnet_url = f"magnet:?xt=urn:btih:{clean_hash}"
-                else:
-                    magnet_url = hash_or_magnet
-                magnets.append(magnet_url)
-            
             try:
-                url = f"{self.base_url}/magnets/check?magnet={','.join([quote(m) for m in magnets])}"
-                if ip:
-                    url += f"&client_ip={ip}"
-                
-                logger.debug(f"Vérification de {len(magnets)} magnets sur StremThru-{self.store_name}")
+                url = self._check_url(chunk, ip)
+                logger.debug(f"Vérification de {len(chunk)} magnets sur StremThru-{self.store_name}")
                 
                 response = self.session.get(url)
                 
                 if response.status_code == 200:
                     try:
-                        json_data = response.json()
-                        if json_data and "data" in json_data and "items" in json_data["data"]:
-                            for item in json_data["data"]["items"]:
-                                if item.get("status") == "cached":
-                                    hash_value = item["hash"].lower()
-                                    results.append({
-                                        "hash": hash_value,
-                                        "status": "cached",
-                                        "files": item.get("files", []),
-                                        "store_name": self.store_name,
-                                        "debrid": StremThru.get_underlying_debrid_code(self.store_name)
-                                    })
-                                    logger.debug(f"Magnet caché trouvé sur StremThru-{self.store_name}: {hash_value}")
+                        results.extend(self._cached_items(response.json()))
                     except Exception as json_e:
                         logger.warning(f"Erreur lors du parsing JSON: {json_e}")
             except Exception as e:
                 logger.warning(f"Erreur lors de la vérification des magnets sur StremThru-{self.store_name}: {e}")
                 
         return results
+
+    async def _check_chunk(self, chunk, ip=None):
+        await self._global_rate_limit_async()
+        url = self._check_url(chunk, ip)
+        logger.debug(f"Vérification de {len(chunk)} magnets sur StremThru-{self.store_name}")
+
+        timeout = aiohttp.ClientTimeout(total=settings.debrid_timeout)
+        async with get_http_session().get(url, headers=self._store_headers(), timeout=timeout) as response:
+            status_code = response.status
+            content = await response.read()
+        await record_quota(self.quota_key, status_code, response.headers, self.global_period)
+
+        if status_code == 429 or status_code >= 500:
+            raise ChunkError(f"status code {status_code}", response.headers.get("Retry-After"))
+        if status_code != 200:
+            logger.warning(f"StremThru-{self.store_name}: Vérification refusée, code {status_code}")
+            return []
+        return self._cached_items(json.loads(content))
+
+    async def _check_availability(self, hashes_or_magnets, ip=None):
+        results = await check_in_chunks(
+            f"StremThru-{self.store_name}",
+            hashes_or_magnets,
+            lambda chunk: self._check_chunk(chunk, ip),
+            self.availability_chunk_size,
+            self.availability_concurrency,
+            settings.debrid_availability_deadline,
+        )
+        logger.debug(f"StremThru-{self.store_name}: {len(results)} torrents en cache trouvés")
+        return results
+
+    @staticmethod
+    def _info_hash(hash_or_magnet):
+        if hash_or_magnet.startswith('magnet:'):
+            hash_match = re.search(r'btih:([a-fA-F0-9]{40})', hash_or_magnet)
+            return hash_match.group(1).lower() if hash_match else hash_or_magnet
+        return hash_or_magnet.lower()[:40]
+
+    async def get_availability_bulk_async(self, hashes_or_magnets, ip=None):
+        """get_availability_bulk() with its chunks checked concurrently, partial results past the deadline.
+        Concurrent requests on the same store account share one check."""
+        if not hashes_or_magnets or not self.store_name:
+            return []
+        if settings.debrid_batch_window_ms <= 0:
+            return await self._check_availability(hashes_or_magnets, ip)
+        # Batches are per client IP, the check is sent with the IP of its requests
+        batcher = get_batcher(f"{self.provider}-{self.store_name}", self.account, ip)
+        hashes = [self._info_hash(hash_or_magnet) for hash_or_magnet in hashes_or_magnets]
+        return await batcher.check(hashes, lambda batch: self._check_availability(batch, ip))
     
     def add_magnet(self, magnet, ip=None):
         """Ajoute un magnet à StremThru
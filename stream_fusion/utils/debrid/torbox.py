@@ -16,6 +16,9 @@ class Torbox(BaseDebrid):
         self.token = settings.tb_token if settings.tb_unique_account else self.config["TBToken"]
         logger.info(f"Torbox: Initialized with base URL: {self.base_url}")
 
+    def _account_token(self):
+        return self.token
+
     def get_headers(self):
         if settings.tb_unique_account:
             if not settings.proxied_link:
@@ -143,23 +146,39 @@ class Torbox(BaseDebrid):
         return download_link_response['data']
 
     def get_availability_bulk(self, hashes_or_magnets, ip=None):
-        logger.info(f"Torbox: Checking availability for {len(hashes_or_magnets)} hashes/magnets")
-        
         all_results = []
-        
+        for batch_number, url in self._availability_urls(hashes_or_magnets):
+            response = self.json_response(url, headers=self.get_headers())
+            if not self._add_batch_results(all_results, batch_number, response):
+                return None
+        return self._format_availability(hashes_or_magnets, all_results)
+
+    async def get_availability_bulk_async(self, hashes_or_magnets, ip=None):
+        all_results = []
+        headers = self.get_headers()
+        for batch_number, url in self._availability_urls(hashes_or_magnets):
+            response = await self.json_response_async(url, headers=headers)
+            if not self._add_batch_results(all_results, batch_number, response):
+                return None
+        return self._format_availability(hashes_or_magnets, all_results)
+
+    def _availability_urls(self, hashes_or_magnets):
+        logger.info(f"Torbox: Checking availability for {len(hashes_or_magnets)} hashes/magnets")
         for i in range(0, len(hashes_or_magnets), 50):
             batch = list(islice(hashes_or_magnets, i, i + 50))
             logger.info(f"Torbox: Checking batch of {len(batch)} hashes/magnets (batch {i//50 + 1})")
             url = f"{self.base_url}/torrents/checkcached?hash={','.join(batch)}&format=list&list_files=true"
             logger.trace(f"Torbox: Requesting URL: {url}")
-            response = self.json_response(url, headers=self.get_headers())
-            
-            if response and response.get("success") and response["data"]:
-                all_results.extend(response["data"])
-            else:
-                logger.debug(f"Torbox: No cached avaibility for batch {i//50 + 1}")
-                return None
-            
+            yield i // 50 + 1, url
+
+    def _add_batch_results(self, all_results, batch_number, response):
+        if response and response.get("success") and response["data"]:
+            all_results.extend(response["data"])
+            return True
+        logger.debug(f"Torbox: No cached avaibility for batch {batch_number}")
+        return False
+
+    def _format_availability(self, hashes_or_magnets, all_results):
         logger.info(f"Torbox: Availability check completed for all {len(hashes_or_magnets)} hashes/magnets")
         return {
             "success": True,
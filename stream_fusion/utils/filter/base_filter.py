@@ -4,6 +4,10 @@ class BaseFilter:
         self.item_type = additional_config
 
     def filter(self, data):
+        return [item for item in data if self.matches(item)]
+
+    def matches(self, item) -> bool:
+        """Per-item predicate, used by FilterPlan to run every filter in a single pass."""
         raise NotImplementedError
 
     def can_filter(self):
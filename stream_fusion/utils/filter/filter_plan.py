@@ -0,0 +1,118 @@
+import hashlib
+import json
+import threading
+from typing import Callable, List, Tuple
+
+from cachetools import LRUCache
+
+from stream_fusion.utils.filter.language_filter import LanguageFilter
+from stream_fusion.utils.filter.language_priority_filter import LanguagePriorityFilter
+from stream_fusion.utils.filter.max_size_filter import MaxSizeFilter
+from stream_fusion.utils.filter.quality_exclusion_filter import QualityExclusionFilter
+from stream_fusion.utils.filter.title_exclusion_filter import TitleExclusionFilter
+from stream_fusion.utils.torrent.torrent_item import TorrentItem
+from stream_fusion.logging_config import logger
+
+Predicate = Callable[[TorrentItem], bool]
+
+# Config keys the compiled plan depends on
+PLAN_CONFIG_KEYS = ("languages", "maxSize", "exclusionKeywords", "exclusion")
+
+
+class _FilterFailed(Exception):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.name = name
+
+
+class FilterPlan:
+    """
+    Config filters compiled once and evaluated in a single pass per item.
+    Media-dependent predicates (season, year, title) are passed to run().
+    """
+
+    def __init__(self, config: dict, media_type: str):
+        filters = {
+            "languages": LanguageFilter(config),
+            "maxSize": MaxSizeFilter(config, media_type),
+            "exclusionKeywords": TitleExclusionFilter(config),
+            "exclusion": QualityExclusionFilter(config),
+        }
+        self.predicates: List[Tuple[str, Predicate]] = []
+        for name, filter_instance in filters.items():
+            try:
+                if filter_instance.can_filter():
+                    self.predicates.append((name, filter_instance.matches))
+            except Exception as e:
+                logger.error(f"Filters: Error while compiling {name} filter", exc_info=e)
+        self.language_priority_filter = LanguagePriorityFilter(config)
+
+    def run(self, items: List[TorrentItem], media_predicates: List[Tuple[str, Predicate]]) -> List[TorrentItem]:
+        """
+        Keeps the items every predicate accepts. As when the filters were
+        applied one after the other, a config filter that fails is skipped as
+        a whole: the pass is done again without it. Media predicates raise.
+        """
+        predicates = media_predicates + self.predicates
+        while True:
+            try:
+                kept, rejected = self._single_pass(items, predicates)
+                break
+            except _FilterFailed as failure:
+                logger.error(f"Filters: Error while applying {failure.name} filter", exc_info=failure.__cause__)
+                predicates = [(name, predicate) for name, predicate in predicates if name != failure.name]
+
+        for item in kept:
+            try:
+                item.language_priority = self.language_priority_filter.get_language_priority(item)
+            except Exception as e:
+                # The item keeps the lowest priority rather than failing the whole request
+                logger.error(f"Filters: Error while applying language priority filter on {item.raw_title}", exc_info=e)
+
+        logger.info(
+            f"Filters: Single pass kept {len(kept)}/{len(items)} items, rejected per filter: {rejected}"
+        )
+        return kept
+
+    def _single_pass(self, items: List[TorrentItem], predicates: List[Tuple[str, Predicate]]):
+        config_filters = {name for name, _ in self.predicates}
+        rejected = {name: 0 for name, _ in predicates}
+        kept = []
+
+        for item in items:
+            for name, predicate in predicates:
+                try:
+                    accepted = predicate(item)
+                except Exception as e:
+                    if name not in config_filters:
+                        raise
+                    raise _FilterFailed(name) from e
+                if not accepted:
+                    rejected[name] += 1
+                    break
+            else:
+                kept.append(item)
+        return kept, rejected
+
+    @staticmethod
+    def fingerprint(config: dict, media_type: str) -> str:
+        relevant = {key: config.get(key) for key in PLAN_CONFIG_KEYS}
+        relevant["media_type"] = media_type
+        key_string = json.dumps(relevant, sort_keys=True, default=str)
+        return hashlib.sha256(key_string.encode("utf-8")).hexdigest()[:16]
+
+
+_plan_cache = LRUCache(maxsize=256)
+_plan_cache_lock = threading.Lock()
+
+
+def get_filter_plan(config: dict, media_type: str) -> FilterPlan:
+    key = FilterPlan.fingerprint(config, media_type)
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+    if plan is None:
+        logger.debug(f"Filters: Compiling filter plan {key}")
+        plan = FilterPlan(config, media_type)
+        with _plan_cache_lock:
+            _plan_cache[key] = plan
+    return plan
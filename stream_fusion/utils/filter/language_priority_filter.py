@@ -1,10 +1,9 @@
-import re
 from typing import List, Dict
 
 from RTN import ParsedData, title_match
-from stream_fusion.constants import FRENCH_PATTERNS
 from stream_fusion.utils.filter.base_filter import BaseFilter
 from stream_fusion.logging_config import logger
+from stream_fusion.utils.parser.title_classifier import classify_title
 from stream_fusion.utils.torrent.torrent_item import TorrentItem
 
 
@@ -60,7 +59,7 @@ class LanguagePriorityFilter(BaseFilter):
         Utilise RTN pour l'analyse et le classement des torrents.
         """
         for torrent in data:
-            language_priority = self._get_language_priority(torrent)
+            language_priority = self.get_language_priority(torrent)
             
             torrent.language_priority = language_priority
             
@@ -73,7 +72,7 @@ class LanguagePriorityFilter(BaseFilter):
         
         return sorted_data
 
-    def _get_language_priority(self, torrent: TorrentItem) -> int:
+    def get_language_priority(self, torrent: TorrentItem) -> int:
         """
         Détermine la priorité de langue d'un torrent.
         
@@ -110,12 +109,8 @@ class LanguagePriorityFilter(BaseFilter):
         """
         if not title:
             return None
-            
-        for language, pattern in FRENCH_PATTERNS.items():
-            if re.search(pattern, title, re.IGNORECASE):
-                return language
-        
-        return None
+
+        return classify_title(title).french_variant
         
     def _convert_language_code(self, lang_code: str) -> str:
         """
@@ -8,16 +8,17 @@ class MaxSizeFilter(BaseFilter):
         self.max_size_bytes = int(self.config['maxSize']) * 1024 * 1024 * 1024  # Convertir Go en octets
 
     def filter(self, data):
-        filtered_data = []
-        for torrent in data:
-            torrent_size = int(torrent.size) if isinstance(torrent.size, str) else torrent.size
-            if torrent_size <= self.max_size_bytes:
-                filtered_data.append(torrent)
-            else:
-                logger.trace(f"Excluded torrent due to size: {torrent.raw_title}, Size: {torrent_size / (1024*1024*1024):.2f} GB")
+        filtered_data = [torrent for torrent in data if self.matches(torrent)]
         logger.debug(f"MaxSizeFilter: input {len(data)}, output {len(filtered_data)}")
         return filtered_data
 
+    def matches(self, torrent) -> bool:
+        torrent_size = int(torrent.size) if isinstance(torrent.size, str) else torrent.size
+        if torrent_size <= self.max_size_bytes:
+            return True
+        logger.trace(f"Excluded torrent due to size: {torrent.raw_title}, Size: {torrent_size / (1024*1024*1024):.2f} GB")
+        return False
+
     def can_filter(self):
         return int(self.config['maxSize']) > 0 and self.item_type == 'movie'
 
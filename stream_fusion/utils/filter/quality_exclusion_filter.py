@@ -9,7 +9,9 @@ class QualityExclusionFilter(BaseFilter):
 
     def __init__(self, config: dict):
         super().__init__(config)
-        self.excluded_qualities = {quality.upper() for quality in self.config.get('exclusion', [])}
+        self.excluded_qualities = getattr(config, "excluded_qualities", None)
+        if self.excluded_qualities is None:
+            self.excluded_qualities = {quality.upper() for quality in self.config.get('exclusion', [])}
         self.exclude_rips = "RIPS" in self.excluded_qualities
         self.exclude_cams = "CAM" in self.excluded_qualities
         self.exclude_hevc = "HEVC" in self.excluded_qualities
@@ -17,10 +19,10 @@ class QualityExclusionFilter(BaseFilter):
     def filter(self, data):
         return [
             stream for stream in data
-            if self._is_stream_allowed(stream)
+            if self.matches(stream)
         ]
 
-    def _is_stream_allowed(self, stream: TorrentItem) -> bool:
+    def matches(self, stream: TorrentItem) -> bool:
 
         parsed_data = stream.parsed_data
 
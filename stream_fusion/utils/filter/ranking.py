@@ -0,0 +1,46 @@
+import heapq
+from typing import Callable, List, Optional
+
+from stream_fusion.utils.torrent.torrent_item import TorrentItem
+from stream_fusion.logging_config import logger
+
+quality_order = {"2160p": 0, "1080p": 1, "720p": 2, "480p": 3}
+
+
+def sort_quality(item: TorrentItem):
+    logger.trace(f"Filters: Evaluating quality for item: {item.raw_title}")
+    if not item.parsed_data.resolution:
+        return float("inf"), True
+    resolution = item.parsed_data.resolution
+    priority = quality_order.get(resolution, float("inf"))
+    return priority, item.parsed_data.resolution is None
+
+
+def sort_key(sort_method: str) -> Optional[Callable]:
+    """Ascending key equivalent to the sort method, None when it is unknown."""
+    if sort_method == "quality":
+        return sort_quality
+    if sort_method == "sizeasc":
+        return lambda x: int(x.size)
+    if sort_method == "sizedesc":
+        # sorted(reverse=True) keeps ties in input order, so does a negated key
+        return lambda x: -int(x.size)
+    if sort_method == "qualitythensize":
+        return lambda x: (sort_quality(x), -int(x.size))
+    return None
+
+
+def ranking_key(sort_method: str) -> Callable:
+    """Composite key used by filter_items: language priority first, then the sort method."""
+    key = sort_key(sort_method)
+    if key is None:
+        logger.warning(f"Filters: Unrecognized sort method: {sort_method}. Sorting by language priority only.")
+        return lambda x: x.language_priority
+    return lambda x: (x.language_priority, key(x))
+
+
+def top_n(items: List[TorrentItem], key: Callable, limit: Optional[int] = None) -> List[TorrentItem]:
+    """Same result as sorted(items, key=key)[:limit] without sorting everything."""
+    if limit is None or limit >= len(items):
+        return sorted(items, key=key)
+    return heapq.nsmallest(max(limit, 0), items, key=key)
@@ -1,4 +1,7 @@
+import heapq
+
 from stream_fusion.utils.filter.base_filter import BaseFilter
+from stream_fusion.utils.filter.ranking import ranking_key
 from stream_fusion.logging_config import logger
 
 class ResultsPerQualityFilter(BaseFilter):
@@ -42,6 +45,43 @@ class ResultsPerQualityFilter(BaseFilter):
         logger.debug(f"ResultsPerQualityFilter: input {len(data)}, output {len(filtered_items)}")
         return filtered_items
 
+    def rank(self, data):
+        """
+        Same output as filter(filter_items(data, sort=True)) on unsorted candidates:
+        each resolution keeps a bounded heap of its best items instead of sorting
+        the whole list first.
+        """
+        sort_method = self.config.get('sort', '')
+        key = ranking_key(sort_method)
+        if sort_method in ['sizedesc', 'sizeasc', 'qualitythensize']:
+            limit = None
+            item_key = key
+        else:
+            limit = max(self.max_results_per_quality, 0)
+            # Inside one resolution the quality part of the key is constant
+            item_key = lambda x: x.language_priority
+
+        resolution_groups = {}
+        for index, item in enumerate(data):
+            resolution = getattr(item.parsed_data, 'resolution', "?.BZH.?")
+            # The input index keeps ties in input order, like a stable sort
+            resolution_groups.setdefault(resolution, []).append((item_key(item), index, item))
+
+        ranked_groups = []
+        for resolution, entries in resolution_groups.items():
+            if limit is None or limit >= len(entries):
+                best = sorted(entries)
+            else:
+                best = heapq.nsmallest(limit, entries)
+            # Resolutions come out in the order of their best item, as after a full sort
+            _, first_index, first_item = best[0] if best else min(entries)
+            ranked_groups.append(((key(first_item), first_index), best))
+        ranked_groups.sort(key=lambda group: group[0])
+
+        filtered_items = [item for _, best in ranked_groups for _, _, item in best]
+        logger.debug(f"ResultsPerQualityFilter: ranked input {len(data)}, output {len(filtered_items)}")
+        return filtered_items
+
     def can_filter(self):
         can_apply = self.max_results_per_quality > 0
         logger.debug(f"ResultsPerQualityFilter.can_filter() returned {can_apply} with max_results_per_quality={self.max_results_per_quality}")
@@ -5,18 +5,17 @@ from stream_fusion.logging_config import logger
 class TitleExclusionFilter(BaseFilter):
     def __init__(self, config):
         super().__init__(config)
-        self.excluded_keywords = {keyword.upper() for keyword in self.config.get('exclusionKeywords', [])}
+        self.excluded_keywords = getattr(config, "excluded_keywords", None)
+        if self.excluded_keywords is None:
+            self.excluded_keywords = {keyword.upper() for keyword in self.config.get('exclusionKeywords', [])}
 
     def filter(self, data):
-        filtered_items = []
-        for stream in data:
-            if self._should_include_stream(stream):
-                filtered_items.append(stream)
-        
+        filtered_items = [stream for stream in data if self.matches(stream)]
+
         logger.debug(f"TitleExclusionFilter: input {len(data)}, output {len(filtered_items)}")
         return filtered_items
 
-    def _should_include_stream(self, stream):
+    def matches(self, stream) -> bool:
         try:
             title_upper = stream.raw_title.upper()
             for keyword in self.excluded_keywords:
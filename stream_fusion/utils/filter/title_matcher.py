@@ -0,0 +1,139 @@
+import re
+import threading
+from collections import Counter
+from typing import Tuple
+
+from cachetools import LRUCache
+from RTN import title_match
+from RTN.patterns import normalize_title
+
+from stream_fusion.logging_config import logger
+
+TITLE_MATCH_THRESHOLD = 0.85  # RTN title_match() default
+
+INTEGRALE_PATTERN = re.compile(
+    r"\b(INTEGRALE|COMPLET|COMPLETE|INTEGRAL)\b", re.IGNORECASE
+)
+
+
+def clean_tmdb_title(title):
+    # Dictionary of characters to filter, grouped by category
+    characters_to_filter = {
+        "punctuation": r'<>"/\\|?*',
+        "control": r"\x00-\x1F",
+        "symbols": r"\u2122\u00AE\u00A9\u2120\u00A1\u00BF\u2013\u2014\u2018\u2019\u201C\u201D\u2022\u2026",
+        "spaces": r"\s+",
+    }
+
+    filter_pattern = "".join([f"[{chars}]" for chars in characters_to_filter.values()])
+    cleaned_title = re.sub(r":(\S)", r" \1", title)
+    cleaned_title = re.sub(r"\s*:\s*", " ", cleaned_title)
+    cleaned_title = re.sub(filter_pattern, " ", cleaned_title)
+    cleaned_title = cleaned_title.strip()
+    cleaned_title = re.sub(characters_to_filter["spaces"], " ", cleaned_title)
+
+    return cleaned_title
+
+
+def _trigrams(text: str) -> Counter:
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _is_ordered_subset(subset_words: Tuple[str, ...], full_set_words: Tuple[str, ...]) -> bool:
+    subset_index = 0
+    for word in full_set_words:
+        if subset_index < len(subset_words) and word == subset_words[subset_index]:
+            subset_index += 1
+    return subset_index == len(subset_words)
+
+
+class _TitleAlias:
+    __slots__ = ("title", "words", "normalized", "trigrams")
+
+    def __init__(self, title: str):
+        self.title = title
+        self.words = tuple(title.lower().split())
+        self.normalized = normalize_title(title)
+        self.trigrams = _trigrams(self.normalized)
+
+
+class TitleMatcher:
+    """
+    Title matching index built once per media from media.titles.
+
+    Each title is an alias with its token tuple and trigram profile
+    precomputed, and decisions are memoized per parsed title.
+    """
+
+    def __init__(self, titles):
+        self.aliases = []
+        for title in titles:
+            cleaned = INTEGRALE_PATTERN.sub("", clean_tmdb_title(title)).strip()
+            self.aliases.append(_TitleAlias(cleaned))
+        self._memo = LRUCache(maxsize=4096)
+        self._lock = threading.Lock()
+
+    def matches(self, parsed_title: str) -> bool:
+        with self._lock:
+            cached = self._memo.get(parsed_title)
+        if cached is not None:
+            return cached
+
+        result = self._match(parsed_title)
+        with self._lock:
+            self._memo[parsed_title] = result
+        return result
+
+    def _match(self, parsed_title: str) -> bool:
+        cleaned_item_title = INTEGRALE_PATTERN.sub("", parsed_title).strip()
+        item_words = tuple(cleaned_item_title.lower().split())
+        item_normalized = None
+        item_trigrams = None
+
+        for alias in self.aliases:
+            if _is_ordered_subset(item_words, alias.words) or _is_ordered_subset(alias.words, item_words):
+                logger.trace(f"Filters: Ordered subset match for {cleaned_item_title} with title: {alias.title}")
+                return True
+
+            if item_normalized is None:
+                item_normalized = normalize_title(cleaned_item_title)
+                item_trigrams = _trigrams(item_normalized)
+            if not self._may_fuzzy_match(alias, item_normalized, item_trigrams):
+                continue
+
+            if title_match(alias.title, cleaned_item_title):
+                logger.trace(f"Filters: title_match() succeeded for {cleaned_item_title} with title: {alias.title}")
+                return True
+
+        return False
+
+    @staticmethod
+    def _may_fuzzy_match(alias: _TitleAlias, item_normalized: str, item_trigrams: Counter) -> bool:
+        """
+        Conservative prefilter for the Levenshtein ratio used by title_match:
+        it never rejects a pair that could reach the threshold.
+        """
+        total_length = len(alias.normalized) + len(item_normalized)
+        if total_length == 0:
+            return True
+        max_distance = int((1 - TITLE_MATCH_THRESHOLD) * total_length)
+        if abs(len(alias.normalized) - len(item_normalized)) > max_distance:
+            return False
+
+        # Every insertion or deletion breaks at most 3 trigrams of either side
+        shared = sum((alias.trigrams & item_trigrams).values())
+        needed = max(sum(alias.trigrams.values()), sum(item_trigrams.values())) - 3 * max_distance
+        return shared >= needed
+
+
+_matchers = LRUCache(maxsize=512)
+_matchers_lock = threading.Lock()
+
+
+def get_title_matcher(titles) -> TitleMatcher:
+    key = tuple(titles)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = _matchers[key] = TitleMatcher(titles)
+    return matcher
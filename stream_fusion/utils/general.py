@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional, List, Dict
-from RTN import parse
+from stream_fusion.utils.parser.title_parser import parse_title
 import re
 
 from stream_fusion.logging_config import logger
@@ -16,7 +16,7 @@ def season_episode_in_filename(filename, season, episode):
     if not is_video_file(filename):
         return False
 
-    parsed_name = parse(filename)
+    parsed_name = parse_title(filename)
 
     return season in parsed_name.seasons and episode in parsed_name.episodes
 
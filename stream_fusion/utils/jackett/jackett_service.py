@@ -5,7 +5,7 @@ import time
 import xml.etree.ElementTree as ET
 
 import requests
-from RTN import parse
+from stream_fusion.utils.parser.title_parser import parse_title
 from requests_ratelimiter import HTTPAdapter
 from urllib3 import Retry
 
@@ -282,7 +282,7 @@ class JackettService:
 
     def __post_process_results(self, results, media):
         for result in results:
-            parsed_result = parse(result.raw_title)
+            parsed_result = parse_title(result.raw_title)
             
             result.parsed_data = parsed_result
             result.languages = detect_languages(result.raw_title)
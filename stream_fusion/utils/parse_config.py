@@ -1,11 +1,45 @@
+import hashlib
 import json
+import threading
+
+from cachetools import LRUCache
 
 from stream_fusion.utils.string_encoding import decodeb64
 from stream_fusion.logging_config import logger
+from stream_fusion.settings import settings
+
+
+def config_fingerprint(config: dict) -> str:
+    config_string = json.dumps(config, sort_keys=True)
+    return hashlib.sha256(config_string.encode("utf-8")).hexdigest()[:16]
+
+
+class ParsedConfig(dict):
+    """
+    Decoded user config, shared by every request made with the same config
+    string. Keys are read-only, derived values are computed once.
+    """
+
+    __slots__ = ("fingerprint", "excluded_keywords", "excluded_qualities")
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        self.fingerprint = config_fingerprint(config)
+        self.excluded_keywords = frozenset(keyword.upper() for keyword in config.get("exclusionKeywords", []))
+        self.excluded_qualities = frozenset(quality.upper() for quality in config.get("exclusion", []))
 
-def parse_config(b64config):
-    config = json.loads(decodeb64(b64config))
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("ParsedConfig is read-only, copy it with dict(config) first")
 
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # Pickled and deep-copied configs come back as plain dicts
+        return dict, (dict(self),)
+
+
+def normalize_config(config: dict) -> dict:
     if "languages" not in config:
         config["languages"] = [config["language"]]
     if "jackett" not in config:
@@ -21,3 +55,63 @@ def parse_config(b64config):
         logger.warning("addonHost not found in config, using default")
         config["addonHost"] = "http://127.0.0.1:8000"
     return config
+
+
+def _decode_config(b64config):
+    return normalize_config(json.loads(decodeb64(b64config)))
+
+
+class ConfigCache:
+    """Process-wide LRU of parsed configs keyed by the raw config string or profile reference."""
+
+    def __init__(self, maxsize: int):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, b64config: str) -> ParsedConfig:
+        config = self.lookup(b64config)
+        if config is None:
+            config = ParsedConfig(_decode_config(b64config))
+            self.store(b64config, config)
+        return config
+
+    def lookup(self, key: str) -> ParsedConfig | None:
+        with self._lock:
+            config = self._cache.get(key)
+            if config is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return config
+
+    def store(self, key: str, config: ParsedConfig) -> None:
+        with self._lock:
+            self._cache[key] = config
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+config_cache = ConfigCache(maxsize=settings.config_cache_size)
+
+
+def parse_config(b64config) -> ParsedConfig:
+    return config_cache.get(b64config)
@@ -1,11 +1,11 @@
 import json
-import queue
-import threading
 from typing import List, Dict
 
-from RTN import ParsedData
+from stream_fusion.utils.torrent.compact_parsed_data import CompactParsedData
 from stream_fusion.settings import settings
+from stream_fusion.utils.cache.local_redis import RedisCache
 from stream_fusion.utils.models.media import Media
+from stream_fusion.utils.security.playback_token import PlaybackTokens, playback_tokens_enabled
 from stream_fusion.utils.torrent.torrent_item import TorrentItem
 from stream_fusion.utils.string_encoding import encodeb64
 
@@ -22,31 +22,33 @@ from stream_fusion.utils.parser.parser_utils import (
 
 
 class StreamParser:
+    # Services de debrid principaux puis additionnels
+    DEBRID_NAMES = {
+        "RD": "Real-Debrid",
+        "AD": "AllDebrid",
+        "TB": "TorBox",
+        "PM": "Premiumize",
+        "OC": "Offcloud",
+        "DL": "DebridLink",
+        "ED": "EasyDebrid",
+        "PK": "PikPak",
+    }
+
     def __init__(self, config: Dict):
         self.config = config
+        # Per-request invariants, computed once instead of once per item
         self.configb64 = encodeb64(json.dumps(config).replace("=", "%3D"))
+        self.playback_url = f"{self.config['addonHost']}/playback/{self.configb64}"
+        self.download_service = self.config.get("debridDownloader", settings.download_service)
+        self.playback_tokens = PlaybackTokens(config) if playback_tokens_enabled() else None
 
     def parse_to_stremio_streams(
         self, torrent_items: List[TorrentItem], media: Media
     ) -> List[Dict]:
+        # Rendering is only string formatting, it runs inline
         stream_list = []
-        threads = []
-        thread_results_queue = queue.Queue()
-
         for torrent_item in torrent_items[: int(self.config["maxResults"])]:
-            thread = threading.Thread(
-                target=self._parse_to_debrid_stream,
-                args=(torrent_item, thread_results_queue, media),
-                daemon=True,
-            )
-            thread.start()
-            threads.append(thread)
-
-        for thread in threads:
-            thread.join()
-
-        while not thread_results_queue.empty():
-            stream_list.append(thread_results_queue.get())
+            self._parse_to_debrid_stream(torrent_item, stream_list, media)
 
         if self.config["debrid"]:
             stream_list = sorted(stream_list, key=filter_by_availability)
@@ -79,21 +81,23 @@ class StreamParser:
 
 
     def _parse_to_debrid_stream(
-        self, torrent_item: TorrentItem, results: queue.Queue, media: Media
+        self, torrent_item: TorrentItem, results: List[Dict], media: Media
     ) -> None:
-        parsed_data: ParsedData = torrent_item.parsed_data
+        parsed_data: CompactParsedData = torrent_item.parsed_data
         name = self._create_stream_name(torrent_item, parsed_data)
         title = self._create_stream_title(torrent_item, parsed_data, media)
 
-        queryb64 = encodeb64(
-            json.dumps(torrent_item.to_debrid_stream_query(media))
-        ).replace("=", "%3D")
+        query_json = json.dumps(torrent_item.to_debrid_stream_query(media))
+        if self.playback_tokens is not None:
+            url = f"{self.config['addonHost']}/playback/{self.playback_tokens.mint(query_json)}"
+        else:
+            url = self._legacy_playback_url(query_json)
 
-        results.put(
+        results.append(
             {
                 "name": name,
                 "description": title,
-                "url": f"{self.config['addonHost']}/playback/{self.configb64}/{queryb64}",
+                "url": url,
                 "behaviorHints": {
                     "bingeGroup": self._generate_binge_group(torrent_item, media),
                     "filename": torrent_item.file_name or torrent_item.raw_title,
@@ -104,34 +108,36 @@ class StreamParser:
         if self.config["torrenting"] and torrent_item.privacy == "public":
             self._add_direct_torrent_stream(torrent_item, parsed_data, title, results, media)
 
+    def _legacy_playback_url(self, query_json: str) -> str:
+        queryb64 = encodeb64(query_json).replace("=", "%3D")
+        return f"{self.playback_url}/{queryb64}"
+
+    async def store_playback_tokens(self, stream_list: List[Dict], redis_cache: RedisCache) -> None:
+        """Saves the tokens minted by parse_to_stremio_streams(), to await before serving the list."""
+        if self.playback_tokens is None:
+            return
+        pending = self.playback_tokens.pending
+        if await self.playback_tokens.store(redis_cache):
+            return
+        # Without Redis the tokens cannot be resolved, fall back to self-contained URLs
+        for stream in stream_list:
+            if "url" in stream:
+                token = stream["url"].rsplit("/", 1)[-1]
+                stream["url"] = self._legacy_playback_url(pending[token])
+
     def _create_stream_name(
-        self, torrent_item: TorrentItem, parsed_data: ParsedData
+        self, torrent_item: TorrentItem, parsed_data: CompactParsedData
     ) -> str:
         resolution = parsed_data.resolution or "Unknown"
-        # Services de debrid principaux
-        if torrent_item.availability == "RD":
-            name = f"{INSTANTLY_AVAILABLE}instant\nReal-Debrid\n({resolution})"
-        elif torrent_item.availability == "AD":
-            name = f"{INSTANTLY_AVAILABLE}instant\nAllDebrid\n({resolution})"
-        elif torrent_item.availability == "TB":
-            name = f"{INSTANTLY_AVAILABLE}instant\nTorBox\n({resolution})"
-        elif torrent_item.availability == "PM":
-            name = f"{INSTANTLY_AVAILABLE}instant\nPremiumize\n({resolution})"
-        # Services de debrid additionnels
-        elif torrent_item.availability == "OC":
-            name = f"{INSTANTLY_AVAILABLE}instant\nOffcloud\n({resolution})"
-        elif torrent_item.availability == "DL":
-            name = f"{INSTANTLY_AVAILABLE}instant\nDebridLink\n({resolution})"
-        elif torrent_item.availability == "ED":
-            name = f"{INSTANTLY_AVAILABLE}instant\nEasyDebrid\n({resolution})"
-        elif torrent_item.availability == "PK":
-            name = f"{INSTANTLY_AVAILABLE}instant\nPikPak\n({resolution})"
+        debrid_name = self.DEBRID_NAMES.get(torrent_item.availability)
+        if debrid_name:
+            name = f"{INSTANTLY_AVAILABLE}instant\n{debrid_name}\n({resolution})"
         else:
-            name = f"{DOWNLOAD_REQUIRED}download\n{self.config.get("debridDownloader", settings.download_service)}\n({resolution})"
+            name = f"{DOWNLOAD_REQUIRED}download\n{self.download_service}\n({resolution})"
         return name
 
     def _create_stream_title(
-        self, torrent_item: TorrentItem, parsed_data: ParsedData, media: Media
+        self, torrent_item: TorrentItem, parsed_data: CompactParsedData, media: Media
     ) -> str:
         title = f"{torrent_item.raw_title}\n"
 
@@ -145,7 +151,7 @@ class StreamParser:
         return title.strip()
 
     def _add_language_info(
-        self, torrent_item: TorrentItem, parsed_data: ParsedData
+        self, torrent_item: TorrentItem, parsed_data: CompactParsedData
     ) -> str:
         info = (
             "/".join(get_emoji(lang) for lang in torrent_item.languages)
@@ -167,7 +173,7 @@ class StreamParser:
         size_in_gb = round(int(torrent_item.size) / 1024 / 1024 / 1024, 2)
         return f"🔍 {torrent_item.indexer} 💾 {size_in_gb}GB 👥 {torrent_item.seeders} \n"
 
-    def _add_media_info(self, parsed_data: ParsedData) -> str:
+    def _add_media_info(self, parsed_data: CompactParsedData) -> str:
         info = []
         if parsed_data.codec:
             info.append(f"🎥 {parsed_data.codec}")
@@ -180,16 +186,16 @@ class StreamParser:
     def _add_direct_torrent_stream(
         self,
         torrent_item: TorrentItem,
-        parsed_data: ParsedData,
+        parsed_data: CompactParsedData,
         title: str,
-        results: queue.Queue,
+        results: List[Dict],
         media: Media,
     ) -> None:
         direct_torrent_name = f"{DIRECT_TORRENT}\n{parsed_data.quality}\n"
         if parsed_data.quality and parsed_data.quality[0] not in ["Unknown", ""]:
             direct_torrent_name += f"({'|'.join(parsed_data.quality)})"
 
-        results.put(
+        results.append(
             {
                 "name": direct_torrent_name,
                 "description": title,
@@ -1,6 +1,5 @@
-import re
 from typing import Dict
-from stream_fusion.constants import FR_RELEASE_GROUPS, FRENCH_PATTERNS
+from stream_fusion.utils.parser.title_classifier import classify_title
 
 INSTANTLY_AVAILABLE = "⚡"
 DOWNLOAD_REQUIRED = "⬇️​​"
@@ -22,12 +21,7 @@ def filter_by_direct_torrent(item: Dict) -> int:
     return 1 if item["name"].startswith(DIRECT_TORRENT) else 0
 
 def extract_release_group(title: str) -> str:
-    combined_pattern = "|".join(FR_RELEASE_GROUPS)
-    match = re.search(combined_pattern, title)
-    return match.group(0) if match else None
+    return classify_title(title).release_group
 
 def detect_french_language(title: str) -> str:
-    for language, pattern in FRENCH_PATTERNS.items():
-        if re.search(pattern, title, re.IGNORECASE):
-            return language
-    return None
\ No newline at end of file
+    return classify_title(title).french_variant
\ No newline at end of file
@@ -0,0 +1,94 @@
+import re
+import threading
+from typing import Optional, Tuple
+
+from cachetools import LRUCache
+
+from stream_fusion.constants import (
+    FR_RELEASE_GROUPS,
+    FRENCH_VARIANT_TOKENS,
+    LANGUAGE_TOKENS,
+)
+from stream_fusion.settings import settings
+
+
+class TitleClassification:
+    __slots__ = ("languages", "french_variant", "release_group")
+
+    def __init__(self, languages: Tuple[str, ...], french_variant: Optional[str], release_group: Optional[str]):
+        self.languages = languages
+        self.french_variant = french_variant
+        self.release_group = release_group
+
+    def __repr__(self):
+        return (
+            f"TitleClassification(languages={self.languages!r}, "
+            f"french_variant={self.french_variant!r}, release_group={self.release_group!r})"
+        )
+
+
+class TitleClassifier:
+    """
+    Compiled once: a single scan of the title finds the release group and
+    every whole word, words are then looked up in the language and French
+    variant tables. Results are memoized per title.
+    """
+
+    def __init__(self, maxsize: int = 50000):
+        # Release groups are tried first so the leftmost one wins, as with re.search()
+        self._scanner = re.compile(
+            "(?P<group>" + "|".join(FR_RELEASE_GROUPS) + r")|(?P<word>\w+)"
+        )
+
+        self._word_languages = {}
+        for language, tokens in LANGUAGE_TOKENS.items():
+            for token in tokens:
+                self._word_languages.setdefault(token, set()).add(language)
+        self._language_order = tuple(LANGUAGE_TOKENS)
+
+        self._word_variants = {}
+        for variant, tokens in FRENCH_VARIANT_TOKENS.items():
+            for token in tokens:
+                self._word_variants.setdefault(token, set()).add(variant)
+        self._variant_order = tuple(FRENCH_VARIANT_TOKENS)
+
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def classify(self, title: str) -> TitleClassification:
+        with self._lock:
+            cached = self._cache.get(title)
+        if cached is not None:
+            return cached
+
+        result = self._classify(title)
+        with self._lock:
+            self._cache[title] = result
+        return result
+
+    def _classify(self, title: str) -> TitleClassification:
+        release_group = None
+        languages = set()
+        variants = set()
+
+        for match in self._scanner.finditer(title):
+            word = match.group(0)
+            # A release group is always a whole word of its own
+            if release_group is None and match.group("group") is not None:
+                release_group = word
+            word = word.upper()
+            languages.update(self._word_languages.get(word, ()))
+            variants.update(self._word_variants.get(word, ()))
+
+        return TitleClassification(
+            languages=tuple(language for language in self._language_order if language in languages),
+            french_variant=next((variant for variant in self._variant_order if variant in variants), None),
+            release_group=release_group,
+        )
+
+
+title_classifier = TitleClassifier(maxsize=settings.parse_cache_size)
+
+
+def classify_title(title: str) -> TitleClassification:
+    return title_classifier.classify(title)
@@ -0,0 +1,115 @@
+import hashlib
+import threading
+
+import orjson
+from cachetools import LRUCache
+from RTN import parse
+
+from stream_fusion.logging_config import logger
+from stream_fusion.services.redis.shared_client import get_shared_redis_client
+from stream_fusion.settings import settings
+from stream_fusion.utils.torrent.compact_parsed_data import CompactParsedData
+
+
+class TitleParseService:
+    """
+    Process-wide memoized RTN parser.
+
+    Results are kept in a bounded LRU keyed by the raw string and, when
+    enabled, shared by all the workers through Redis, one key per title with
+    its own expiry. Parsing itself never waits on Redis: warm() loads the
+    titles a request is about to parse, flush() stores the new ones.
+    """
+
+    REDIS_KEY_PREFIX = "rtn:parsed:"
+    MAX_PENDING = 10000
+
+    def __init__(self, maxsize: int, use_redis: bool = False):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._use_redis = use_redis
+        self._pending = {}  # Parsed since the last flush()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _redis_key(self, raw: str) -> str:
+        return self.REDIS_KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+    async def warm(self, raws) -> None:
+        """Loads from Redis the titles of raws not in the local cache yet."""
+        if not self._use_redis:
+            return
+        with self._lock:
+            missing = [raw for raw in dict.fromkeys(raws) if raw and raw not in self._cache]
+        if not missing:
+            return
+        try:
+            cached = await get_shared_redis_client().mget([self._redis_key(raw) for raw in missing])
+        except Exception as e:
+            logger.debug(f"TitleParseService: Redis lookup failed: {e}")
+            return
+
+        with self._lock:
+            for raw, value in zip(missing, cached):
+                if value is not None:
+                    self._cache[raw] = CompactParsedData.from_dict(orjson.loads(value))
+                    self.redis_hits += 1
+
+    async def flush(self) -> None:
+        """Stores in Redis the titles parsed since the last flush."""
+        if not self._use_redis:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            pipeline = get_shared_redis_client().pipeline(transaction=False)
+            for raw, parsed in pending.items():
+                pipeline.set(self._redis_key(raw), orjson.dumps(parsed.to_dict()), ex=settings.redis_expiration)
+            await pipeline.execute()
+        except Exception as e:
+            logger.debug(f"TitleParseService: Redis store failed: {e}")
+
+    def parse(self, raw: str) -> CompactParsedData:
+        with self._lock:
+            parsed = self._cache.get(raw)
+            if parsed is not None:
+                self.hits += 1
+                return parsed
+
+        parsed = CompactParsedData.from_parsed_data(parse(raw))
+        with self._lock:
+            self.misses += 1
+            self._cache[raw] = parsed
+            if self._use_redis and len(self._pending) < self.MAX_PENDING:
+                self._pending[raw] = parsed
+        return parsed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._pending.clear()
+            self.hits = self.redis_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        # Titles loaded from Redis are counted again as hits when parsed
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+title_parse_service = TitleParseService(
+    maxsize=settings.parse_cache_size, use_redis=settings.parse_cache_redis
+)
+
+
+def parse_title(raw: str) -> CompactParsedData:
+    return title_parse_service.parse(raw)
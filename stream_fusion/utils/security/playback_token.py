@@ -0,0 +1,134 @@
+import base64
+import hashlib
+import hmac
+import re
+import secrets
+
+import orjson
+
+from stream_fusion.logging_config import logger
+from stream_fusion.settings import settings
+from stream_fusion.utils.cache.local_redis import RedisCache
+from stream_fusion.utils.parse_config import ParsedConfig, config_fingerprint
+
+# Config fingerprint, query id, then the signature of both
+TOKEN_PATTERN = re.compile(r"^(?P<body>(?P<config>[0-9a-f]{16})[A-Za-z0-9_-]{11})(?P<signature>[A-Za-z0-9_-]{22})$")
+TOKEN_KEY_PREFIX = "playback:token:"
+CONFIG_KEY_PREFIX = "playback:config:"
+NONCE_SIZE = 16
+TAG_SIZE = 16
+
+_secret = settings.playback_token_secret or settings.secret_api_key
+if settings.playback_tokens and not _secret:
+    logger.warning("PlaybackTokens: No playback_token_secret or secret_api_key configured, playback tokens disabled")
+
+
+def _derive_key(label: bytes) -> bytes:
+    return hmac.new(_secret.encode("utf-8"), label, hashlib.sha256).digest() if _secret else b""
+
+
+# Same key on every worker, so any of them resolves the tokens the others minted
+_signing_key = _derive_key(b"playback-token:sign")
+_encryption_key = _derive_key(b"playback-token:encrypt")
+_authentication_key = _derive_key(b"playback-token:authenticate")
+
+
+def playback_tokens_enabled() -> bool:
+    return settings.playback_tokens and bool(_secret)
+
+
+def _b64(digest: bytes) -> str:
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def sign(message: str) -> str:
+    digest = hmac.new(_signing_key, message.encode("utf-8"), hashlib.sha256).digest()
+    return _b64(digest[:16])
+
+
+def _keystream(nonce: bytes, length: int) -> bytes:
+    blocks = (
+        hmac.new(_encryption_key, nonce + counter.to_bytes(4, "big"), hashlib.sha256).digest()
+        for counter in range((length + 31) // 32)
+    )
+    return b"".join(blocks)[:length]
+
+
+def seal(plaintext: bytes) -> bytes:
+    """
+    Encrypt-then-MAC with HMAC-SHA256 only: the stored config holds debrid
+    credentials, Redis only ever sees it encrypted.
+    """
+    nonce = secrets.token_bytes(NONCE_SIZE)
+    ciphertext = bytes(a ^ b for a, b in zip(plaintext, _keystream(nonce, len(plaintext))))
+    tag = hmac.new(_authentication_key, nonce + ciphertext, hashlib.sha256).digest()[:TAG_SIZE]
+    return nonce + ciphertext + tag
+
+
+def unseal(sealed: bytes) -> bytes | None:
+    if len(sealed) < NONCE_SIZE + TAG_SIZE:
+        return None
+    nonce, ciphertext, tag = sealed[:NONCE_SIZE], sealed[NONCE_SIZE:-TAG_SIZE], sealed[-TAG_SIZE:]
+    expected = hmac.new(_authentication_key, nonce + ciphertext, hashlib.sha256).digest()[:TAG_SIZE]
+    if not hmac.compare_digest(tag, expected):
+        return None
+    return bytes(a ^ b for a, b in zip(ciphertext, _keystream(nonce, len(ciphertext))))
+
+
+class PlaybackTokens:
+    """
+    Short playback tokens minted while rendering one stream list.
+    A token maps in Redis to the debrid query (file index, season,
+    episode...) of one stream, the config is stored encrypted once per
+    fingerprint.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.fingerprint = config.fingerprint if isinstance(config, ParsedConfig) else config_fingerprint(config)
+        self.pending = {}
+
+    def mint(self, query_json: str) -> str:
+        query_id = _b64(hashlib.sha256(query_json.encode("utf-8")).digest()[:8])
+        body = self.fingerprint + query_id
+        token = body + sign(body)
+        self.pending[token] = query_json
+        return token
+
+    async def store(self, redis_cache: RedisCache) -> bool:
+        if not self.pending:
+            return True
+        expiration = settings.playback_token_expiration
+        try:
+            client = await redis_cache.get_redis_client()
+            pipeline = client.pipeline(transaction=False)
+            pipeline.set(CONFIG_KEY_PREFIX + self.fingerprint, seal(orjson.dumps(self.config)), ex=expiration)
+            for token, query_json in self.pending.items():
+                pipeline.set(TOKEN_KEY_PREFIX + token, query_json, ex=expiration)
+            await pipeline.execute()
+        except Exception as e:
+            logger.error(f"PlaybackTokens: Failed to store {len(self.pending)} tokens: {e}")
+            return False
+        logger.debug(f"PlaybackTokens: Stored {len(self.pending)} tokens for config {self.fingerprint}")
+        self.pending = {}
+        return True
+
+
+async def resolve_playback_token(token: str, redis_cache: RedisCache):
+    """Returns (config, decoded_query) for a token, None when forged, unknown or expired."""
+    match = TOKEN_PATTERN.match(token)
+    if not match or not playback_tokens_enabled():
+        return None
+    # Checked before any lookup, a forged token never reaches Redis
+    if not hmac.compare_digest(sign(match.group("body")), match.group("signature")):
+        return None
+
+    client = await redis_cache.get_redis_client()
+    query, sealed_config = await client.mget(TOKEN_KEY_PREFIX + token, CONFIG_KEY_PREFIX + match.group("config"))
+    if query is None or sealed_config is None:
+        return None
+    config = unseal(sealed_config)
+    if config is None:
+        logger.error(f"PlaybackTokens: Stored config {match.group('config')} failed authentication")
+        return None
+    return ParsedConfig(orjson.loads(config)), query.decode("utf-8")
@@ -3,6 +3,7 @@ from fastapi import Security, HTTPException
 from fastapi.security import APIKeyHeader, APIKeyQuery
 from starlette.status import HTTP_403_FORBIDDEN
 from stream_fusion.services.postgresql.dao.apikey_dao import APIKeyDAO
+from stream_fusion.services.redis.api_key_cache import get_api_key_state, is_api_key_valid, record_usage
 from stream_fusion.logging_config import logger
 
 API_KEY_NAME = "api-key"
@@ -26,7 +27,10 @@ async def api_key_security(
         )
 
     api_key = query_param or header_param
-    is_valid = await apikey_dao.check_key(api_key)
+    try:
+        is_valid = await is_api_key_valid(UUID(api_key), apikey_dao)
+    except ValueError:
+        is_valid = False
 
     if not is_valid:
         raise HTTPException(
@@ -34,18 +38,21 @@ async def api_key_security(
             detail="Wrong, revoked, or expired API key.",
         )
 
+    await record_usage(api_key)
     return api_key
 
 
-async def check_api_key(api_key: str, apikey_dao: APIKeyDAO):
+async def check_api_key(api_key: str, apikey_dao: APIKeyDAO) -> dict:
     try:
         api_key_uuid = UUID(api_key)
     except ValueError:
         logger.error(f"Invalid API key format: {api_key}")
         raise HTTPException(status_code=400, detail="Invalid API key format")
-    is_valid = await apikey_dao.check_key(api_key_uuid)
-    if not is_valid:
+    key_state = await get_api_key_state(api_key_uuid, apikey_dao)
+    if key_state is None:
         raise HTTPException(
             status_code=HTTP_403_FORBIDDEN,
             detail="Wrong, revoked, or expired API key.",
         )
+    await record_usage(api_key_uuid)
+    return key_state
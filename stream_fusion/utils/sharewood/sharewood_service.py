@@ -1,7 +1,7 @@
 import re
 import urllib.parse
 from typing import List, Union
-from RTN import parse
+from stream_fusion.utils.parser.title_parser import parse_title
 
 from stream_fusion.logging_config import logger
 from stream_fusion.utils.detection import detect_languages
@@ -224,7 +224,7 @@ class SharewoodService:
             item.privacy = "private"
             item.languages = detect_languages(item.raw_title, default_language="fr")
             item.type = media.type
-            item.parsed_data = parse(item.raw_title)
+            item.parsed_data = parse_title(item.raw_title)
 
             items.append(item)
 
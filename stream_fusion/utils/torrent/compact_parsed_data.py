@@ -0,0 +1,71 @@
+from RTN.models import ParsedData
+
+
+class CompactParsedData:
+    """
+    Lightweight view over the RTN ParsedData fields used by StreamFusion.
+    The full ParsedData is only rebuilt when to_parsed_data() is called.
+    """
+
+    __slots__ = (
+        "raw_title",
+        "parsed_title",
+        "resolution",
+        "quality",
+        "codec",
+        "audio",
+        "seasons",
+        "episodes",
+        "group",
+    )
+
+    def __init__(self, raw_title=None, parsed_title=None, resolution=None, quality=None, codec=None,
+                 audio=None, seasons=None, episodes=None, group=None):
+        self.raw_title = raw_title
+        self.parsed_title = parsed_title
+        self.resolution = resolution
+        self.quality = quality
+        self.codec = codec
+        self.audio = audio if audio is not None else []
+        self.seasons = seasons if seasons is not None else []
+        self.episodes = episodes if episodes is not None else []
+        self.group = group
+
+    @classmethod
+    def from_parsed_data(cls, parsed_data: ParsedData):
+        return cls(
+            raw_title=parsed_data.raw_title,
+            parsed_title=parsed_data.parsed_title,
+            resolution=parsed_data.resolution,
+            quality=parsed_data.quality,
+            codec=parsed_data.codec,
+            audio=list(parsed_data.audio),
+            seasons=list(parsed_data.seasons),
+            episodes=list(parsed_data.episodes),
+            group=parsed_data.group,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        # Accepts both the compact form and a full ParsedData.model_dump()
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+    @classmethod
+    def coerce(cls, value):
+        if value is None or isinstance(value, cls):
+            return value
+        if isinstance(value, ParsedData):
+            return cls.from_parsed_data(value)
+        if isinstance(value, dict):
+            return cls.from_dict(value)
+        raise TypeError(f"Cannot build CompactParsedData from {type(value)}")
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def to_parsed_data(self) -> ParsedData:
+        data = {k: v for k, v in self.to_dict().items() if v is not None}
+        return ParsedData(**data)
+
+    def __repr__(self):
+        return f"CompactParsedData({self.raw_title!r}, resolution={self.resolution!r})"
@@ -1,17 +1,37 @@
-from RTN import parse
-from RTN.models import ParsedData
+from stream_fusion.utils.parser.title_parser import parse_title
 from urllib.parse import quote
 
 from stream_fusion.utils.models.media import Media
 from stream_fusion.utils.models.series import Series
+from stream_fusion.utils.torrent.compact_parsed_data import CompactParsedData
 from stream_fusion.logging_config import logger
 
 
 class TorrentItem:
+    __slots__ = (
+        "raw_title",
+        "size",
+        "magnet",
+        "info_hash",
+        "link",
+        "seeders",
+        "languages",
+        "indexer",
+        "type",
+        "privacy",
+        "file_name",
+        "files",
+        "torrent_download",
+        "trackers",
+        "file_index",
+        "full_index",
+        "availability",
+        "language_priority",
+        "_parsed_data",
+    )
+
     def __init__(self, raw_title, size, magnet, info_hash, link, seeders, languages, indexer,
                  privacy, type=None, parsed_data=None):
-        self.logger = logger
-
         self.raw_title = raw_title  # Raw title of the torrent
         self.size = size  # Size of the video file inside the torrent - it may be updated during __process_torrent()
         self.magnet = magnet  # Magnet to torrent
@@ -30,8 +50,17 @@ class TorrentItem:
         self.file_index = None  # Index of the file inside of the torrent - it may be updated durring __process_torrent() and update_availability(). If the index is None and torrent is not None, it means that the series episode is not inside of the torrent.
         self.full_index = None  # Case where we cannot call RD to get the full index. Else None
         self.availability = False  # If it's instantly available on the debrid service
+        self.language_priority = 999  # Set by LanguagePriorityFilter
+
+        self.parsed_data = parsed_data  # Ranked result, kept as CompactParsedData
+
+    @property
+    def parsed_data(self) -> CompactParsedData:
+        return self._parsed_data
 
-        self.parsed_data: ParsedData = parsed_data  # Ranked result
+    @parsed_data.setter
+    def parsed_data(self, value):
+        self._parsed_data = CompactParsedData.coerce(value)
 
     def to_debrid_stream_query(self, media: Media) -> dict:
         return {
@@ -64,6 +93,7 @@ class TorrentItem:
             'file_index': self.file_index,
             'full_index': self.full_index,
             'availability': self.availability,
+            'parsed_data': self.parsed_data.to_dict() if self.parsed_data else None,
         }
     
     @classmethod
@@ -93,6 +123,11 @@ class TorrentItem:
         instance.full_index = data['full_index']
         instance.availability = data['availability']
         
-        instance.parsed_data = parse(instance.raw_title)
+        parsed_data = data.get('parsed_data')
+        if parsed_data:
+            instance.parsed_data = CompactParsedData.from_dict(parsed_data)
+        else:
+            # Entries cached before the compact form was stored
+            instance.parsed_data = parse_title(instance.raw_title)
 
         return instance
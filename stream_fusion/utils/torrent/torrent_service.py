@@ -6,7 +6,7 @@ from typing import List
 
 import bencode
 import requests
-from RTN import parse
+from stream_fusion.utils.parser.title_parser import parse_title
 
 from stream_fusion.services.postgresql.dao.torrentitem_dao import TorrentItemDAO
 from stream_fusion.utils.jackett.jackett_result import JackettResult
@@ -254,7 +254,7 @@ class TorrentService:
         for files in file_structure:
             for file in files["path"]:
 
-                parsed_file = parse(file)
+                parsed_file = parse_title(file)
 
                 if season[0] in parsed_file.seasons and episode[0] in parsed_file.episodes:
                     episode_files.append({
@@ -289,7 +289,7 @@ class TorrentService:
             _, file_extension = os.path.splitext(file_name.lower())
             
             if file_extension in video_formats:
-                parsed_file = parse(file_name)
+                parsed_file = parse_title(file_name)
                 if len(parsed_file.seasons) == 0 or len(parsed_file.episodes) == 0:
                     self.logger.debug(f"Skipping file without season or episode parsed: {file_name}")
                     continue
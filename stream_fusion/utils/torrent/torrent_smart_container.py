@@ -2,13 +2,14 @@ import os
 import threading
 
 from typing import List, Dict
-from RTN import parse
+from stream_fusion.utils.parser.title_parser import parse_title
 
 from stream_fusion.utils.debrid.alldebrid import AllDebrid
 from stream_fusion.utils.debrid.premiumize import Premiumize
 from stream_fusion.utils.debrid.realdebrid import RealDebrid
 from stream_fusion.utils.debrid.torbox import Torbox
 from stream_fusion.utils.debrid.stremthru import StremThru
+from stream_fusion.utils.filter.ranking import sort_key
 from stream_fusion.utils.torrent.torrent_item import TorrentItem
 from stream_fusion.utils.cache.cache import cache_public
 from stream_fusion.utils.general import season_episode_in_filename
@@ -30,16 +31,42 @@ class TorrentSmartContainer:
         # Log pour indiquer que tous les torrents sont inclus
         self.logger.info("TorrentSmartContainer: Including all torrents regardless of seeders count")
 
-    def get_unaviable_hashes(self):
+    def get_unaviable_hashes(self, shortlist=None):
         hashes = []
-        for hash, item in self.__itemsDict.items():
-            if item.availability is False:
+        candidates = self.__itemsDict.keys() if shortlist is None else shortlist
+        for hash in candidates:
+            if self.__itemsDict[hash].availability is False:
                 hashes.append(hash)
         self.logger.debug(
             f"TorrentSmartContainer: Retrieved {len(hashes)} hashes to process"
         )
         return hashes
 
+    def get_availability_shortlists(self, sort_method, shortlist_size: int):
+        """
+        Yields the hashes to check against the debrid services, best ranked first,
+        shortlist_size at a time. A size of 0 yields None once, meaning every hash.
+        """
+        if shortlist_size <= 0:
+            yield None
+            return
+
+        # Same order as the final sort_items(), which is stable on the container order
+        items = list(self.__itemsDict.values())
+        key = sort_key(sort_method)
+        if key is not None:
+            items = sorted(items, key=key)
+
+        for start in range(0, len(items), shortlist_size):
+            shortlist = [item.info_hash for item in items[start:start + shortlist_size]]
+            self.logger.debug(
+                f"TorrentSmartContainer: Availability shortlist {start}-{start + len(shortlist)} of {len(items)}"
+            )
+            yield shortlist
+
+    def count_available(self) -> int:
+        return sum(1 for item in self.__itemsDict.values() if item.availability)
+
     def get_items(self):
         items = list(self.__itemsDict.values())
         self.logger.debug(f"TorrentSmartContainer: Retrieved {len(items)} items")
@@ -174,6 +201,23 @@ class TorrentSmartContainer:
         self.logger.info(
             f"TorrentSmartContainer: Updating availability for {debrid_type.__name__}"
         )
+        # Items a service already made available keep that service and its file,
+        # the answer of the next service only fills in the others
+        available = [
+            (item, item.availability, item.file_index, item.file_name, item.size)
+            for item in self.__itemsDict.values()
+            if item.availability
+        ]
+        try:
+            self._dispatch_availability(debrid_response, debrid_type, media)
+        finally:
+            for item, availability, file_index, file_name, size in available:
+                item.availability = availability
+                item.file_index = file_index
+                item.file_name = file_name
+                item.size = size
+
+    def _dispatch_availability(self, debrid_response, debrid_type, media):
         if debrid_type is RealDebrid:
             self._update_availability_realdebrid(debrid_response, media)
         elif debrid_type is AllDebrid:
@@ -370,13 +414,14 @@ class TorrentSmartContainer:
             for item in torrent_items:
                 if item.info_hash.lower() == hash.lower():
                     is_available = status.get("transcoded", False)
-                    item.availability = "PM" if is_available else None
+                    if is_available:
+                        item.availability = "PM"
                     
                     # Mettre à jour les détails du fichier si disponible
                     if is_available:
                         if item.type == "series":
                             # Pour les séries, vérifier si le fichier sélectionné correspond à l'épisode
-                            if "full_index" in item.__dict__ and item.full_index:
+                            if item.full_index:
                                 # Si nous avons l'index complet des fichiers, l'utiliser
                                 matching_files = []
                                 for file_info in item.full_index:
@@ -579,7 +624,7 @@ class TorrentSmartContainer:
                         file["e"], files, file_index, type, media
                     )
                     continue
-                parsed_file = parse(file["n"])
+                parsed_file = parse_title(file["n"])
                 clean_season = media.season.replace("S", "")
                 clean_episode = media.episode.replace("E", "")
                 numeric_season = int(clean_season)
@@ -1,4 +1,4 @@
-from RTN import parse
+from stream_fusion.utils.parser.title_parser import parse_title
 
 from stream_fusion.utils.torrent.torrent_item import TorrentItem
 from stream_fusion.logging_config import logger
@@ -47,7 +47,7 @@ class ZileanResult:
         if len(self.info_hash) != 40:
             raise ValueError(f"The hash '{self.info_hash}' does not have the expected length of 40 characters.")
 
-        parsed_result = parse(api_cached_item.raw_title)
+        parsed_result = parse_title(api_cached_item.raw_title)
 
         self.raw_title = parsed_result.raw_title
         self.indexer = "DMM - API"
@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from stream_fusion.utils.parse_config import config_cache
+from stream_fusion.utils.parser.title_parser import title_parse_service
+
 router = APIRouter()
 
 
@@ -10,3 +13,19 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/parse-cache")
+def parse_cache_stats() -> dict:
+    """
+    Returns the hit/miss counters of the RTN parse cache for this worker.
+    """
+    return title_parse_service.stats()
+
+
+@router.get("/config-cache")
+def config_cache_stats() -> dict:
+    """
+    Returns the hit/miss counters of the decoded config cache for this worker.
+    """
+    return config_cache.stats()
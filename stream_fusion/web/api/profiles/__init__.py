@@ -0,0 +1,4 @@
+from stream_fusion.web.api.profiles.views import router
+
+
+__all__ = ["router"]
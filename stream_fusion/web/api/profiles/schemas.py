@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ProfileSave(BaseModel):
+    config: dict = Field(..., description="User config, as encoded in addon URLs")
+    profile_id: Optional[str] = Field(None, description="Profile to update, a new one is created when missing")
+
+
+class ProfileOut(BaseModel):
+    profile_id: str
+    profile_ref: str
+    fingerprint: str
+
+
+class ProfileConfig(BaseModel):
+    profile_id: str
+    config: dict
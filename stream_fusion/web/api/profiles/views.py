@@ -0,0 +1,72 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi_simple_rate_limiter import rate_limiter
+from fastapi_simple_rate_limiter.database import create_redis_session
+
+from stream_fusion.logging_config import logger
+from stream_fusion.services.postgresql.dao.apikey_dao import APIKeyDAO
+from stream_fusion.services.postgresql.dao.config_profile_dao import ConfigProfileDAO
+from stream_fusion.settings import settings
+from stream_fusion.utils.config_profiles import drop_profile, profile_ref, publish_profile
+from stream_fusion.utils.parse_config import normalize_config
+from stream_fusion.utils.security.security_api_key import check_api_key
+from stream_fusion.web.api.profiles.schemas import ProfileConfig, ProfileOut, ProfileSave
+
+router = APIRouter()
+
+redis_session = create_redis_session(host=settings.redis_host, port=settings.redis_port, db=settings.redis_db)
+
+
+def ensure_profiles_enabled():
+    if not settings.config_profiles:
+        raise HTTPException(status_code=404, detail="Config profiles are disabled")
+
+
+@router.post("", dependencies=[Depends(ensure_profiles_enabled)])
+@rate_limiter(limit=10, seconds=60, redis=redis_session)
+async def save_profile(
+    profile: ProfileSave,
+    request: Request,
+    apikey_dao: APIKeyDAO = Depends(),
+    profile_dao: ConfigProfileDAO = Depends(),
+) -> ProfileOut:
+    api_key = profile.config.get("apiKey")
+    if not api_key:
+        raise HTTPException(status_code=401, detail="API key not found in config.")
+    await check_api_key(api_key, apikey_dao)
+
+    saved = await profile_dao.save_profile(UUID(api_key), normalize_config(profile.config), profile.profile_id)
+    await publish_profile(saved)
+    logger.info(f"Profiles: Saved profile {saved.profile_id}")
+    return ProfileOut(
+        profile_id=saved.profile_id,
+        profile_ref=profile_ref(saved.profile_id),
+        fingerprint=saved.fingerprint,
+    )
+
+
+@router.get("/{profile_id}", dependencies=[Depends(ensure_profiles_enabled)])
+@rate_limiter(limit=20, seconds=60, redis=redis_session)
+async def get_profile(
+    profile_id: str, request: Request, profile_dao: ConfigProfileDAO = Depends()
+) -> ProfileConfig:
+    # The profile id is as secret as the config it replaces in addon URLs
+    profile = await profile_dao.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Config profile not found")
+    return ProfileConfig(profile_id=profile.profile_id, config=profile.config)
+
+
+@router.delete("/{profile_id}", dependencies=[Depends(ensure_profiles_enabled)])
+async def delete_profile(
+    profile_id: str,
+    api_key: str = Query(..., description="API key owning the profile"),
+    apikey_dao: APIKeyDAO = Depends(),
+    profile_dao: ConfigProfileDAO = Depends(),
+) -> bool:
+    await check_api_key(api_key, apikey_dao)
+    if not await profile_dao.delete_profile(profile_id, UUID(api_key)):
+        raise HTTPException(status_code=404, detail="Config profile not found")
+    await drop_profile(profile_id)
+    return True
@@ -0,0 +1,78 @@
+import threading
+from typing import Optional
+
+from cachetools import LRUCache
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from stream_fusion.settings import settings
+from stream_fusion.web.encoded_response import EncodedPayload, encoded_response
+
+# Payloads served from the cache advertise the time they have left, rounded down to this step
+HINTS_STEP = 60
+_rehinted = LRUCache(maxsize=256)
+_rehinted_lock = threading.Lock()
+
+
+class CacheHints(BaseModel):
+    """Stremio addon protocol cache fields, in seconds."""
+
+    cacheMaxAge: Optional[int] = None
+    staleRevalidate: Optional[int] = None
+    staleError: Optional[int] = None
+
+
+def cache_hints(max_age: int, stale_if_error: bool = True) -> dict:
+    """
+    Hints for a response cached server-side for max_age seconds. Responses
+    whose links expire (playback tokens) must not be kept on errors.
+    """
+    max_age = max(int(max_age), 0)
+    return {
+        "cacheMaxAge": max_age,
+        # Serving the previous list while one refresh runs is as good as the cache itself
+        "staleRevalidate": max_age,
+        "staleError": max(max_age, settings.cache_stale_error) if stale_if_error else None,
+    }
+
+
+def cache_control(max_age: Optional[int], public: bool = False, stale_if_error: bool = True) -> dict:
+    """
+    Cache-Control header for a response expiring server-side in max_age seconds.
+    Only responses that are the same for every user may be public.
+    """
+    if max_age is None:
+        return {"Cache-Control": "no-cache"}
+    hints = cache_hints(max_age, stale_if_error)
+    directives = [
+        "public" if public else "private",
+        f"max-age={hints['cacheMaxAge']}",
+        f"stale-while-revalidate={hints['staleRevalidate']}",
+    ]
+    if hints["staleError"] is not None:
+        directives.append(f"stale-if-error={hints['staleError']}")
+    return {"Cache-Control": ", ".join(directives)}
+
+
+def cached_payload_response(
+    request: Request, payload: EncodedPayload, public: bool = False, stale_if_error: bool = True
+) -> Response:
+    """
+    Serves a payload from the cache. Its body hints were written for the full
+    expiration; the body and Cache-Control both get the time left instead,
+    rounded down to HINTS_STEP so one re-rendered body serves a minute of hits.
+    """
+    max_age = payload.max_age()
+    if max_age is None:
+        return encoded_response(request, payload, cache_control(None))
+    max_age -= max_age % HINTS_STEP
+
+    key = (payload.etag, max_age, stale_if_error)
+    with _rehinted_lock:
+        rehinted = _rehinted.get(key)
+    if rehinted is None:
+        rehinted = payload.with_hints(cache_hints(max_age, stale_if_error))
+        with _rehinted_lock:
+            _rehinted[key] = rehinted
+    return encoded_response(request, rehinted, cache_control(max_age, public, stale_if_error))
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Awaitable
+
+from fastapi import Request, Response
+
+from stream_fusion.logging_config import logger
+
+# Non-standard, but what proxies log for requests the client abandoned
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # Same listener as StreamingResponse, GET requests have no body left to read
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+def shield_from_disconnect(request: Request, awaitable: Awaitable):
+    """
+    Runs a write to completion even if the request is cancelled, for data
+    other requests benefit from. cancel_on_disconnect() waits for it before
+    the request dependencies are closed.
+    """
+    task = asyncio.ensure_future(awaitable)
+    tasks = getattr(request.state, "shielded_tasks", None)
+    if tasks is None:
+        tasks = request.state.shielded_tasks = set()
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return asyncio.shield(task)
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable):
+    """
+    Runs a request handler, cancelling it at its next await point once the
+    client has gone away. Outstanding aiohttp calls are aborted with it.
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if not task.done():
+        logger.info(f"Disconnect: Client left {request.url.path}, cancelling the request")
+        task.cancel()
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            # The server itself is cancelling this request
+            raise
+        pending = getattr(request.state, "shielded_tasks", None)
+        if pending:
+            logger.debug(f"Disconnect: Waiting for {len(pending)} shared cache writes")
+            await asyncio.wait(set(pending))
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
@@ -0,0 +1,203 @@
+import asyncio
+import gzip
+import hashlib
+import time
+from typing import Dict, Optional
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from redis.asyncio import Redis as AsyncRedis
+
+from stream_fusion.logging_config import logger
+from stream_fusion.settings import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODED_KEY_SUFFIX = ":encoded"
+JSON_MEDIA_TYPE = "application/json"
+
+
+def make_etag(body: bytes) -> str:
+    # Weak: gzip and br variants of the same body share the validator
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+class EncodedPayload:
+    """
+    A rendered JSON body with its ETag and compressed variants.
+    Variants are compressed once and kept with the payload, so a cached
+    payload is served as-is on every hit.
+    """
+
+    __slots__ = ("body", "etag", "variants", "expires_at")
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: Optional[str] = None,
+        variants: Optional[Dict[str, bytes]] = None,
+        expires_at: Optional[float] = None,
+    ):
+        self.body = body
+        self.etag = etag or make_etag(body)
+        self.variants = variants or {}
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "EncodedPayload":
+        # Aliases, as FastAPI does when it serializes a returned model
+        return cls(orjson.dumps(model.model_dump(by_alias=True)))
+
+    def encode(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = self.variants[encoding] = _compress(self.body, encoding)
+        return variant
+
+    def with_hints(self, hints: dict) -> "EncodedPayload":
+        """Same content with other top-level cache hints, so it keeps its ETag."""
+        body = orjson.loads(self.body)
+        body.update(hints)
+        return EncodedPayload(orjson.dumps(body), self.etag, expires_at=self.expires_at)
+
+    def precompress(self) -> "EncodedPayload":
+        if len(self.body) >= settings.compression_min_size:
+            for encoding in available_encodings():
+                self.encode(encoding)
+        return self
+
+    def max_age(self) -> Optional[int]:
+        """Seconds left before the cached copy expires, None when it is not cached."""
+        if self.expires_at is None:
+            return None
+        return max(int(self.expires_at - time.time()), 0)
+
+    def to_mapping(self) -> Dict[str, bytes]:
+        mapping = {"body": self.body, "etag": self.etag.encode("ascii")}
+        if self.expires_at is not None:
+            mapping["expires_at"] = str(int(self.expires_at)).encode("ascii")
+        mapping.update(self.variants)
+        return mapping
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[bytes, bytes]) -> Optional["EncodedPayload"]:
+        if not mapping or b"body" not in mapping or b"etag" not in mapping:
+            return None
+        variants = {
+            encoding: mapping[encoding.encode("ascii")]
+            for encoding in available_encodings()
+            if encoding.encode("ascii") in mapping
+        }
+        expires_at = mapping.get(b"expires_at")
+        return cls(
+            mapping[b"body"],
+            mapping[b"etag"].decode("ascii"),
+            variants,
+            float(expires_at) if expires_at else None,
+        )
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding accepted by the client, br before gzip on equal weights."""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def not_modified(request: Request, etag: Optional[str], headers: Optional[dict] = None) -> Optional[Response]:
+    """304 response when the client already holds this ETag, None otherwise."""
+    if etag is None or not etag_matches(request, etag):
+        return None
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag, "Vary": "Accept-Encoding"})
+
+
+def encoded_response(request: Request, payload: EncodedPayload, headers: Optional[dict] = None) -> Response:
+    response = not_modified(request, payload.etag, headers)
+    if response is not None:
+        return response
+
+    response_headers = {**(headers or {}), "ETag": payload.etag, "Vary": "Accept-Encoding"}
+    encoding = None
+    if len(payload.body) >= settings.compression_min_size:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is not None:
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=payload.encode(encoding), media_type=JSON_MEDIA_TYPE, headers=response_headers)
+
+
+async def load_payload(client, key: str) -> Optional[EncodedPayload]:
+    """Reads an encoded payload stored next to a cache entry, with either Redis client."""
+    try:
+        if isinstance(client, AsyncRedis):
+            mapping = await client.hgetall(key + ENCODED_KEY_SUFFIX)
+        else:
+            mapping = await asyncio.to_thread(client.hgetall, key + ENCODED_KEY_SUFFIX)
+    except Exception as e:
+        logger.warning(f"EncodedResponse: Failed to load payload {key}: {e}")
+        return None
+    return EncodedPayload.from_mapping(mapping)
+
+
+async def store_payload(client, key: str, payload: EncodedPayload, expiration: int) -> None:
+    """Stores the body, its ETag and its compressed variants next to a cache entry."""
+    encoded_key = key + ENCODED_KEY_SUFFIX
+    payload.expires_at = time.time() + expiration
+    mapping = payload.precompress().to_mapping()
+
+    try:
+        pipeline = client.pipeline(transaction=True)
+        pipeline.delete(encoded_key)
+        pipeline.hset(encoded_key, mapping=mapping)
+        pipeline.expire(encoded_key, expiration)
+        if isinstance(client, AsyncRedis):
+            await pipeline.execute()
+        else:
+            await asyncio.to_thread(pipeline.execute)
+    except Exception as e:
+        logger.warning(f"EncodedResponse: Failed to store payload {key}: {e}")
+
@@ -1,3 +1,5 @@
+import asyncio
+
 import aiohttp
 
 from yarl import URL
@@ -13,6 +15,9 @@ from stream_fusion.services.postgresql.base import Base
 from stream_fusion.services.postgresql.models import load_all_models
 from stream_fusion.settings import settings
 from stream_fusion.services.postgresql.utils import init_db_cleanup_function
+from stream_fusion.services.redis.invalidation import run_invalidation_listener
+from stream_fusion.services.redis.api_key_cache import run_usage_flusher
+from stream_fusion.utils.debrid.base_debrid import create_http_session, set_http_session
 
 
 def _setup_db(app: FastAPI) -> None:  # pragma: no cover
@@ -72,13 +77,27 @@ async def lifespan_setup(
     timeout = aiohttp.ClientTimeout(total=settings.aiohttp_timeout)
     app.state.http_session = aiohttp.ClientSession(timeout=timeout, connector=connector)
 
+    # Debrid APIs always go through the proxy, playback only with playback_proxy
+    if settings.proxy_url and not settings.playback_proxy:
+        app.state.debrid_session = create_http_session()
+    else:
+        app.state.debrid_session = app.state.http_session
+    set_http_session(app.state.debrid_session)
+
     app.state.redis_pool = ConnectionPool(
         host=settings.redis_host, port=settings.redis_port, db=settings.redis_db, max_connections=50
     )
 
+    app.state.invalidation_listener = asyncio.create_task(run_invalidation_listener())
+    app.state.api_key_usage_flusher = asyncio.create_task(run_usage_flusher(app.state.db_session_factory))
+
     yield
 
     # Shutdown actions
+    app.state.invalidation_listener.cancel()
+    app.state.api_key_usage_flusher.cancel()
+    if app.state.debrid_session is not app.state.http_session:
+        await app.state.debrid_session.close()
     if app.state.http_session:
         await app.state.http_session.close()
     if app.state.redis_pool:
@@ -0,0 +1,70 @@
+import json
+
+from fastapi import Request
+
+from stream_fusion.logging_config import logger
+from stream_fusion.services.postgresql.dao.apikey_dao import APIKeyDAO
+from stream_fusion.settings import settings
+from stream_fusion.utils.debrid.get_debrid_service import get_download_service
+from stream_fusion.utils.security import check_api_key
+
+
+class PlaybackContext:
+    """
+    What a playback request knows about its user, resolved once and shared by
+    every step of the request: the config, the cached key state and the
+    download service.
+    """
+
+    def __init__(self, config: dict, decoded_query: str, ip: str, key_state: dict | None):
+        self.config = config
+        self.decoded_query = decoded_query
+        self.query = json.loads(decoded_query)
+        self.ip = ip
+        self.api_key = config.get("apiKey")
+        self.key_state = key_state
+        self._download_service = None
+
+    @property
+    def cache_user_identifier(self) -> str:
+        return self.api_key if self.api_key else self.ip
+
+    @property
+    def use_proxy(self) -> bool:
+        # Key states cached before proxied_links was part of them fall back to the default
+        if self.key_state is None or "proxied_links" not in self.key_state:
+            return settings.proxied_link
+        return bool(self.key_state["proxied_links"])
+
+    @property
+    def download_service(self):
+        """Instantiated on first use, HEAD requests and cache hits never need it."""
+        if self._download_service is None:
+            self._download_service = get_download_service(self.config)
+        return self._download_service
+
+
+async def get_playback_context(
+    config: dict, decoded_query: str, request: Request, apikey_dao: APIKeyDAO
+) -> PlaybackContext:
+    context = getattr(request.state, "playback_context", None)
+    if context is not None:
+        return context
+
+    api_key = config.get("apiKey")
+    ip = request.client.host
+    key_state = None
+    # Only validate the API key if it exists
+    if api_key:
+        try:
+            key_state = await check_api_key(api_key, apikey_dao)
+            logger.info(f"Playback: Valid API key provided by {ip}")
+        except Exception as e:
+            logger.warning(f"Playback: Invalid API key provided by {ip}. Error: {getattr(e, 'detail', e)}")
+            raise
+    else:
+        logger.info(f"Playback: No API key provided by {ip}. Proceeding without API key validation.")
+
+    context = PlaybackContext(config, decoded_query, ip, key_state)
+    request.state.playback_context = context
+    return context
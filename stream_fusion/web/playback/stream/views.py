@@ -16,15 +16,12 @@ from stream_fusion.services.redis.redis_config import get_redis_cache_dependency
 from stream_fusion.utils.cache.local_redis import RedisCache
 from stream_fusion.logging_config import logger
 from stream_fusion.settings import settings
-from stream_fusion.utils.debrid.get_debrid_service import (
-    get_debrid_service,
-    get_download_service,
-)
 from stream_fusion.utils.debrid.realdebrid import RealDebrid
 from stream_fusion.utils.debrid.torbox import Torbox
-from stream_fusion.utils.parse_config import parse_config
+from stream_fusion.utils.config_profiles import resolve_config
 from stream_fusion.utils.string_encoding import decodeb64
-from stream_fusion.utils.security import check_api_key
+from stream_fusion.utils.security.playback_token import resolve_playback_token
+from stream_fusion.web.playback.stream.context import PlaybackContext, get_playback_context
 from stream_fusion.web.playback.stream.schemas import (
     ErrorResponse,
     HeadResponse,
@@ -112,10 +109,9 @@ class ProxyStreamer:
 #         logger.debug("Streaming connection closed")
 
 
-async def handle_download(
-    query: dict, config: dict, ip: str, redis_cache: RedisCache
-) -> str:
-    api_key = config.get("apiKey")
+async def handle_download(context: PlaybackContext, redis_cache: RedisCache) -> str:
+    query, config, ip = context.query, context.config, context.ip
+    api_key = context.api_key
     cache_key = f"download:{api_key}:{json.dumps(query)}_{ip}"
     
     stremthru_link_key = f"stremthru_link:{api_key}:{json.dumps(query)}_{ip}"
@@ -131,7 +127,7 @@ async def handle_download(
             logger.info("Playback: Direct link found in cache, returning immediately")
             return cached_direct_link
         
-        debrid_service = get_download_service(config)
+        debrid_service = context.download_service
         if debrid_service:
             try:
                 direct_link = debrid_service.get_stream_link(query, config, ip)
@@ -147,7 +143,7 @@ async def handle_download(
         logger.info("Playback: Download in progress, checking if file is now ready")
         
         try:
-            debrid_service = get_download_service(config)
+            debrid_service = context.download_service
             if debrid_service:
                 try:
                     direct_link = debrid_service.get_stream_link(query, config, ip)
@@ -172,7 +168,7 @@ async def handle_download(
                 
                 from stream_fusion.utils.debrid.stremthru import StremThru
                 
-                stremthru_service = get_download_service(config)
+                stremthru_service = context.download_service
                 
                 if not isinstance(stremthru_service, StremThru):
                     logger.warning(f"Playback: Le service de téléchargement n'est pas StremThru, c'est {type(stremthru_service).__name__}")
@@ -201,7 +197,7 @@ async def handle_download(
     )
 
     try:
-        debrid_service = get_download_service(config)
+        debrid_service = context.download_service
         if not debrid_service:
             raise HTTPException(
                 status_code=500, detail="Download service not available"
@@ -267,11 +263,13 @@ async def handle_download(
 
 
 async def get_stream_link(
-    decoded_query: str, config: dict, ip: str, redis_cache: RedisCache, cache_user_identifier: str, stream_id: str = None
+    context: PlaybackContext, redis_cache: RedisCache, stream_id: str = None
 ) -> str:
+    decoded_query, config, ip = context.decoded_query, context.config, context.ip
+    cache_user_identifier = context.cache_user_identifier
     logger.debug(f"Playback: Getting stream link for query: {decoded_query}, IP: {ip}")
     
-    query = json.loads(decoded_query)
+    query = context.query
     if stream_id and query.get("type") == "series":
         cache_key = f"stream_link:{cache_user_identifier}:{stream_id}:{query.get('service', '')}"
         current_source_key = f"current_source:{cache_user_identifier}:{stream_id}:{query.get('service', '')}"
@@ -302,7 +300,7 @@ async def get_stream_link(
         logger.info(f"Playback: Stream link found in cache: {cached_link}")
         return cached_link
 
-    debrid_service = get_download_service(config)
+    debrid_service = context.download_service
     
     if not debrid_service:
         logger.error("Playback: No debrid service available")
@@ -330,46 +328,35 @@ async def get_stream_link(
     return link
 
 
-@router.get("/{config}/{query}", responses={500: {"model": ErrorResponse}})
-@rate_limiter(limit=20, seconds=60, redis=redis_session)
-async def get_playback(
-    config: str,
-    query: str,
+def _playback_error() -> HTTPException:
+    return HTTPException(
+        status_code=500,
+        detail=ErrorResponse(
+            detail="An error occurred while processing the request."
+        ).model_dump(),
+    )
+
+
+async def serve_playback(
+    config: dict,
+    decoded_query: str,
     request: Request,
-    redis_cache: RedisCache = Depends(get_redis_cache_dependency),
-    apikey_dao: APIKeyDAO = Depends(),
+    redis_cache: RedisCache,
+    apikey_dao: APIKeyDAO,
 ):
     try:
-        config = parse_config(config)
-        api_key = config.get("apiKey")
-        ip = request.client.host
-        cache_user_identifier = api_key if api_key else ip
-
-        # Only validate the API key if it exists
-        if api_key:
-            try:
-                await check_api_key(api_key, apikey_dao)
-                logger.info(f"Playback: Valid API key provided by {ip}")
-            except HTTPException as e:
-                logger.warning(f"Playback: Invalid API key provided by {ip}. Error: {e.detail}")
-                raise e # Re-raise if validation fails for a provided key
-        else:
-            logger.info(f"Playback: No API key provided by {ip}. Proceeding without API key validation.")
-
-        if not query:
-            logger.warning("Playback: Query is empty")
-            raise HTTPException(status_code=400, detail="Query required.")
+        context = await get_playback_context(config, decoded_query, request, apikey_dao)
+        ip = context.ip
+        cache_user_identifier = context.cache_user_identifier
 
-        decoded_query = decodeb64(query)
         logger.debug(f"Playback: Decoded query: {decoded_query}, Client IP: {ip}")
 
-        query_dict = json.loads(decoded_query)
+        query_dict = context.query
         logger.debug(f"Playback: Received playback request for query: {decoded_query}")
         service = query_dict.get("service", False)
 
         if service == "DL":
-            # Pass cache_user_identifier to handle_download if needed, otherwise it uses ip/query_dict
-            link = await handle_download(query_dict, config, ip, redis_cache)
+            link = await handle_download(context, redis_cache)
             return RedirectResponse(url=link, status_code=status.HTTP_302_FOUND)
 
         # Use cache_user_identifier for lock key
@@ -390,7 +377,7 @@ async def get_playback(
                     except:
                         pass
                 
-                link = await get_stream_link(decoded_query, config, ip, redis_cache, cache_user_identifier, stream_id)
+                link = await get_stream_link(context, redis_cache, stream_id)
             else:
                 logger.debug("Playback: Lock not acquired, waiting for cached link")
                 # Extract stream_id from referer (same logic as above)
@@ -431,19 +418,11 @@ async def get_playback(
             except LockError:
                 logger.warning("Playback: Failed to release lock (already released)")
 
-        # Vérifier si la proxification est activée pour cette clé API
-        use_proxy = settings.proxied_link  # Valeur par défaut
-        
-        if api_key:
-            try:
-                # Récupérer les informations de la clé API
-                api_key_info = await apikey_dao.get_key_by_uuid(api_key)
-                if api_key_info and hasattr(api_key_info, 'proxied_links'):
-                    use_proxy = api_key_info.proxied_links
-                    logger.info(f"Playback: API key {api_key} has proxied_links={use_proxy}")
-            except Exception as e:
-                logger.error(f"Playback: Error checking API key proxification status: {e}")
-        
+        # La proxification dépend de la clé API, déjà résolue dans le contexte
+        use_proxy = context.use_proxy
+        if context.api_key:
+            logger.info(f"Playback: API key {context.api_key} has proxied_links={use_proxy}")
+
         if not use_proxy:
             logger.debug(f"Playback: Redirecting to non-proxied link: {link}")
             return RedirectResponse(
@@ -504,49 +483,21 @@ async def get_playback(
 
     except Exception as e:
         logger.error(f"Playback: Playback error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=ErrorResponse(
-                detail="An error occurred while processing the request."
-            ).model_dump(),
-        )
+        raise _playback_error()
 
 
-@router.head(
-    "/{config}/{query}",
-    response_model=HeadResponse,
-    responses={500: {"model": ErrorResponse}, 202: {"model": None}},
-)
-async def head_playback(
-    config: str,
-    query: str,
+async def serve_playback_head(
+    config: dict,
+    decoded_query: str,
     request: Request,
-    redis_cache: RedisCache = Depends(get_redis_cache_dependency),
-    apikey_dao: APIKeyDAO = Depends(),
+    redis_cache: RedisCache,
+    apikey_dao: APIKeyDAO,
 ):
     try:
-        config = parse_config(config)
-        api_key = config.get("apiKey")
-        ip = request.client.host
-        cache_user_identifier = api_key if api_key else ip
-
-        # Only validate the API key if it exists
-        if api_key:
-            try:
-                await check_api_key(api_key, apikey_dao)
-                logger.info(f"Playback HEAD: Valid API key provided by {ip}")
-            except HTTPException as e:
-                logger.warning(f"Playback HEAD: Invalid API key provided by {ip}. Error: {e.detail}")
-                raise e # Re-raise if validation fails for a provided key
-        else:
-            # Don't raise 401, just log if no key is provided
-            logger.info(f"Playback HEAD: No API key provided by {ip}. Proceeding without API key validation.")
-
-        if not query:
-            raise HTTPException(status_code=400, detail="Query required.")
+        context = await get_playback_context(config, decoded_query, request, apikey_dao)
+        cache_user_identifier = context.cache_user_identifier
 
-        decoded_query = decodeb64(query)
-        query_dict = json.loads(decoded_query)
+        query_dict = context.query
         service = query_dict.get("service", False)
 
         headers = {
@@ -577,7 +528,7 @@ async def head_playback(
                 link = await redis_cache.get(cache_key)
 
                 if (
-                    not settings.proxied_link
+                    not context.use_proxy
                 ):  # avoid sending HEAD request if link is sent directly
                     return Response(status_code=status.HTTP_200_OK, headers=headers)
 
@@ -607,3 +558,77 @@ async def head_playback(
             ).model_dump_json(),
             media_type="application/json",
         )
+
+
+async def _resolve_token(token: str, redis_cache: RedisCache):
+    resolved = await resolve_playback_token(token, redis_cache)
+    if resolved is None:
+        logger.warning(f"Playback: Unknown or expired playback token {token[:16]}...")
+        raise HTTPException(status_code=404, detail="Unknown or expired playback link.")
+    return resolved
+
+
+@router.get("/{token}", responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
+@rate_limiter(limit=20, seconds=60, redis=redis_session)
+async def get_token_playback(
+    token: str,
+    request: Request,
+    redis_cache: RedisCache = Depends(get_redis_cache_dependency),
+    apikey_dao: APIKeyDAO = Depends(),
+):
+    config, decoded_query = await _resolve_token(token, redis_cache)
+    return await serve_playback(config, decoded_query, request, redis_cache, apikey_dao)
+
+
+@router.head(
+    "/{token}",
+    response_model=HeadResponse,
+    responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}, 202: {"model": None}},
+)
+async def head_token_playback(
+    token: str,
+    request: Request,
+    redis_cache: RedisCache = Depends(get_redis_cache_dependency),
+    apikey_dao: APIKeyDAO = Depends(),
+):
+    config, decoded_query = await _resolve_token(token, redis_cache)
+    return await serve_playback_head(config, decoded_query, request, redis_cache, apikey_dao)
+
+
+@router.get("/{config}/{query}", responses={500: {"model": ErrorResponse}})
+@rate_limiter(limit=20, seconds=60, redis=redis_session)
+async def get_playback(
+    config: str,
+    query: str,
+    request: Request,
+    redis_cache: RedisCache = Depends(get_redis_cache_dependency),
+    apikey_dao: APIKeyDAO = Depends(),
+):
+    try:
+        config = await resolve_config(config, request)
+        decoded_query = decodeb64(query)
+    except Exception as e:
+        logger.error(f"Playback: Invalid playback URL: {str(e)}")
+        raise _playback_error()
+    return await serve_playback(config, decoded_query, request, redis_cache, apikey_dao)
+
+
+@router.head(
+    "/{config}/{query}",
+    response_model=HeadResponse,
+    responses={500: {"model": ErrorResponse}, 202: {"model": None}},
+)
+async def head_playback(
+    config: str,
+    query: str,
+    request: Request,
+    redis_cache: RedisCache = Depends(get_redis_cache_dependency),
+    apikey_dao: APIKeyDAO = Depends(),
+):
+    try:
+        config = await resolve_config(config, request)
+        decoded_query = decodeb64(query)
+    except Exception as e:
+        logger.error(f"Playback HEAD: Invalid playback URL: {str(e)}")
+        raise _playback_error()
+    return await serve_playback_head(config, decoded_query, request, redis_cache, apikey_dao)
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, model_validator
 
+from stream_fusion.web.cache_hints import CacheHints
+
 
 class ErrorResponse(BaseModel):
     detail: str
@@ -51,9 +53,9 @@ class Meta(BaseModel):
         return self
 
 
-class MetaItem(BaseModel):
+class MetaItem(CacheHints):
     meta: Meta
 
 
-class Metas(BaseModel):
+class Metas(CacheHints):
     metas: list[Meta] = []
@@ -9,7 +9,7 @@ from fastapi_simple_rate_limiter.database import create_redis_session
 
 from stream_fusion.services.postgresql.dao.apikey_dao import APIKeyDAO
 from stream_fusion.settings import settings
-from stream_fusion.utils.parse_config import parse_config
+from stream_fusion.utils.config_profiles import resolve_config
 from stream_fusion.utils.security.security_api_key import check_api_key
 from stream_fusion.utils.yggfilx.yggflix_api import YggflixAPI
 from stream_fusion.web.root.catalog.schemas import (
@@ -20,10 +20,20 @@ from stream_fusion.web.root.catalog.schemas import (
     Video,
 )
 from stream_fusion.services.redis.redis_config import get_redis
+from stream_fusion.web.cache_hints import cache_control, cache_hints, cached_payload_response
+from stream_fusion.web.encoded_response import (
+    EncodedPayload,
+    encoded_response,
+    load_payload,
+    store_payload,
+)
 from stream_fusion.logging_config import logger
 
 router = APIRouter()
 
+ITEM_CACHE_DURATION = 7 * 24 * 60 * 60
+CATALOG_CACHE_DURATION = 1800
+
 redis_session = create_redis_session(host=settings.redis_host, port=settings.redis_port, db=settings.redis_db)
 
 tmdb = TMDb()
@@ -48,8 +58,8 @@ async def get_tv_season_details(tmdb_id, season_number):
     return await asyncio.to_thread(season.details, tmdb_id, season_number)
 
 
-async def validate_config_and_api_key(config: str, apikey_dao: APIKeyDAO):
-    config_data = parse_config(config)
+async def validate_config_and_api_key(config: str, request: Request, apikey_dao: APIKeyDAO):
+    config_data = await resolve_config(config, request)
     api_key = config_data.get("apiKey")
     if api_key:  
         await check_api_key(api_key, apikey_dao)
@@ -63,14 +73,31 @@ async def get_cached_item(redis_client: Redis, cache_key: str):
     return None
 
 
+async def get_cached_item_and_ttl(redis_client: Redis, cache_key: str):
+    """Cached item and the seconds it has left, in one round trip."""
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.get(cache_key)
+    pipeline.ttl(cache_key)
+    cached_item, ttl = await asyncio.to_thread(pipeline.execute)
+    return (pickle.loads(cached_item) if cached_item else None), ttl
+
+
 async def cache_item(
-    redis_client: Redis, cache_key: str, item, duration: int = 7 * 24 * 60 * 60
+    redis_client: Redis, cache_key: str, item, duration: int = ITEM_CACHE_DURATION
 ):
     await asyncio.to_thread(
         redis_client.set, cache_key, pickle.dumps(item), ex=duration
     )
 
 
+async def cached_response(request: Request, redis_client: Redis, ttl: int, response_key: str, model):
+    """Renders a model once and stores the response for the ttl its source item has left."""
+    payload = EncodedPayload.from_model(model.model_copy(update=cache_hints(ttl)))
+    if ttl > 0:
+        await store_payload(redis_client, response_key, payload, ttl)
+    return encoded_response(request, payload, cache_control(payload.max_age(), public=True))
+
+
 def extract_year(date_string):
     if date_string and len(date_string) >= 4:
         return date_string[:4]
@@ -161,7 +188,7 @@ async def get_catalog(
     apikey_dao: APIKeyDAO = Depends()
 ):
     try:
-        config_data = parse_config(config)
+        config_data = await resolve_config(config, request)
         api_key = config_data.get("apiKey")
         if api_key:  
             await check_api_key(api_key, apikey_dao)
@@ -183,11 +210,19 @@ async def get_catalog(
             raise HTTPException(status_code=400, detail="Invalid type or catalog id")
 
         cache_key = f"catalog:{type}:{id}"
-        cached_catalog = await get_cached_item(redis_client, cache_key)
+        response_key = f"{cache_key}:skip={skip}"
+        cached_payload = await load_payload(redis_client, response_key)
+        if cached_payload:
+            logger.info(f"Catalog response found in cache for key: {response_key}")
+            return cached_payload_response(request, cached_payload, public=True)
+
+        cached_catalog, ttl = await get_cached_item_and_ttl(redis_client, cache_key)
         if cached_catalog:
             logger.info(f"Catalog found in cache for key: {cache_key}")
             full_catalog = Metas.model_validate(cached_catalog)
-            return Metas(metas=full_catalog.metas[skip:])
+            return await cached_response(
+                request, redis_client, ttl, response_key, Metas(metas=full_catalog.metas[skip:])
+            )
 
         logger.info(f"Catalog not found in cache for key: {cache_key}. Generating...")
 
@@ -293,12 +328,14 @@ async def get_catalog(
 
         catalog = Metas(metas=metas)
         try:
-            await cache_item(redis_client, cache_key, catalog, 1800)
+            await cache_item(redis_client, cache_key, catalog, CATALOG_CACHE_DURATION)
         except Exception as cat_cache_err:
              logger.error(f"Error caching final catalog {cache_key}: {cat_cache_err}")
 
         logger.info(f"Catalog generated and cached for key: {cache_key} with {len(metas)} items.")
-        return Metas(metas=catalog.metas[skip:])
+        return await cached_response(
+            request, redis_client, CATALOG_CACHE_DURATION, response_key, Metas(metas=catalog.metas[skip:])
+        )
 
     except Exception as e:
         logger.error(f"Catalog error: {str(e)}", exc_info=True)
@@ -320,7 +357,7 @@ async def get_meta(
     apikey_dao: APIKeyDAO = Depends()
 ):
     try:
-        config_data = parse_config(config)
+        config_data = await resolve_config(config, request)
         api_key = config_data.get("apiKey")
         if api_key:  
             await check_api_key(api_key, apikey_dao)
@@ -333,11 +370,16 @@ async def get_meta(
             raise HTTPException(status_code=400, detail="Invalid type")
 
         cache_key = f"imdbid_item:{id}"
-        cached_meta = await get_cached_item(redis_client, cache_key)
+        cached_payload = await load_payload(redis_client, cache_key)
+        if cached_payload:
+            logger.info(f"Meta response found in cache for IMDB ID: {id}")
+            return cached_payload_response(request, cached_payload, public=True)
+
+        cached_meta, ttl = await get_cached_item_and_ttl(redis_client, cache_key)
         if cached_meta:
             logger.info(f"Meta found in cache for IMDB ID: {id}")
             meta = Meta.model_validate(cached_meta)
-            return MetaItem(meta=meta)
+            return await cached_response(request, redis_client, ttl, cache_key, MetaItem(meta=meta))
 
         logger.info(f"Meta not found in cache for IMDB ID: {id}, fetching from TMDB")
 
@@ -361,7 +403,7 @@ async def get_meta(
         await cache_item(redis_client, f"tmdbid_to_imdbid:{tmdb_id}", id)
 
         logger.info(f"Meta generated and cached for IMDB ID: {id}, TMDB ID: {tmdb_id}")
-        return MetaItem(meta=meta)
+        return await cached_response(request, redis_client, ITEM_CACHE_DURATION, cache_key, MetaItem(meta=meta))
 
     except Exception as e:
         logger.error(f"Meta error: {str(e)}", exc_info=True)
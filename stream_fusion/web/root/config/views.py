@@ -1,4 +1,6 @@
-from cachetools import TTLCache
+import threading
+
+from cachetools import LRUCache, TTLCache
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -6,15 +8,31 @@ from fastapi.templating import Jinja2Templates
 from stream_fusion.logging_config import logger
 from stream_fusion.services.postgresql.dao.apikey_dao import APIKeyDAO
 from stream_fusion.settings import settings
-from stream_fusion.utils.parse_config import parse_config
+from stream_fusion.utils.config_profiles import resolve_config
 from stream_fusion.utils.security.security_api_key import check_api_key
 from stream_fusion.version import get_version
+from stream_fusion.web.cache_hints import cache_control
+from stream_fusion.web.encoded_response import EncodedPayload, encoded_response
 from stream_fusion.web.root.config.schemas import ManifestResponse
 
 router = APIRouter()
 
 templates = Jinja2Templates(directory="/app/stream_fusion/static")
 stream_cache = TTLCache(maxsize=1000, ttl=3600)
+# Rendered manifests, keyed by the config fields they depend on
+manifest_cache = LRUCache(maxsize=8)
+manifest_cache_lock = threading.Lock()
+
+
+def rendered_manifest(key: tuple, build) -> EncodedPayload:
+    """Manifest body, ETag and compressed variants, rendered once per process."""
+    with manifest_cache_lock:
+        payload = manifest_cache.get(key)
+    if payload is None:
+        payload = EncodedPayload.from_model(build()).precompress()
+        with manifest_cache_lock:
+            manifest_cache[key] = payload
+    return payload
 
 
 @router.get("/")
@@ -35,6 +53,7 @@ async def configure(request: Request):
         "ygg_unique_account": settings.ygg_unique_account,
         "jackett_enable": settings.jackett_enable,
         "tb_unique_account": settings.tb_unique_account,
+        "config_profiles": settings.config_profiles,
     })
 
 
@@ -44,9 +63,7 @@ async def configure(request: Request):
 #     return FileResponse(f"/app/stream_fusion/static/{file_path}")
 
 
-@router.get("/manifest.json")
-async def get_manifest():
-    logger.info("Serving manifest.json")
+def build_manifest() -> ManifestResponse:
     return ManifestResponse(
         id="community.limedrive.streamfusion",
         icon="https://i.imgur.com/q2VSdSp.png",
@@ -101,24 +118,8 @@ async def get_manifest():
         ]
     )
 
-@router.get("/{config}/manifest.json")
-async def get_manifest(config: str, apikey_dao: APIKeyDAO = Depends()):
-    config = parse_config(config)
-    api_key = config.get("apiKey")
-    if api_key:
-        await check_api_key(api_key, apikey_dao)
-    else:
-        # Check if anonymous access is allowed
-        if not settings.allow_anonymous_access: # If NOT allowed
-            logger.warning("Anonymous access denied and API key not found in config.")
-            raise HTTPException(status_code=401, detail="API key required or anonymous access disabled.")
-        else: # If anonymous access IS allowed, just log and continue
-            logger.info("Proceeding without API key (anonymous access allowed).")
-            # No exception is raised, execution continues
-
-    yggflix_ctg = config.get("yggflixCtg", True)
-    yggtorrent_ctg = config.get("yggtorrentCtg", True)
 
+def build_configured_manifest(yggflix_ctg: bool, yggtorrent_ctg: bool) -> ManifestResponse:
     catalogs = []
 
     if yggflix_ctg:
@@ -149,7 +150,6 @@ async def get_manifest(config: str, apikey_dao: APIKeyDAO = Depends()):
             }
         ])
 
-    logger.info("Serving manifest.json")
     return ManifestResponse(
         id="community.limedrive.streamfusion",
         icon="https://i.imgur.com/q2VSdSp.png",
@@ -170,3 +170,37 @@ async def get_manifest(config: str, apikey_dao: APIKeyDAO = Depends()):
          " library and a smooth streaming experience.",
         catalogs=catalogs,
     )
+
+
+@router.get("/manifest.json", response_model=ManifestResponse)
+async def get_manifest(request: Request):
+    logger.info("Serving manifest.json")
+    payload = rendered_manifest(("default",), build_manifest)
+    return encoded_response(request, payload, cache_control(settings.manifest_cache_max_age, public=True))
+
+
+@router.get("/{config}/manifest.json", response_model=ManifestResponse)
+async def get_manifest(config: str, request: Request, apikey_dao: APIKeyDAO = Depends()):
+    config = await resolve_config(config, request)
+    api_key = config.get("apiKey")
+    if api_key:
+        await check_api_key(api_key, apikey_dao)
+    else:
+        # Check if anonymous access is allowed
+        if not settings.allow_anonymous_access: # If NOT allowed
+            logger.warning("Anonymous access denied and API key not found in config.")
+            raise HTTPException(status_code=401, detail="API key required or anonymous access disabled.")
+        else: # If anonymous access IS allowed, just log and continue
+            logger.info("Proceeding without API key (anonymous access allowed).")
+            # No exception is raised, execution continues
+
+    yggflix_ctg = bool(config.get("yggflixCtg", True))
+    yggtorrent_ctg = bool(config.get("yggtorrentCtg", True))
+    payload = rendered_manifest(
+        ("configured", yggflix_ctg, yggtorrent_ctg),
+        lambda: build_configured_manifest(yggflix_ctg, yggtorrent_ctg),
+    )
+
+    logger.info("Serving manifest.json")
+    # The configured manifest embeds the user's catalog choices
+    return encoded_response(request, payload, cache_control(settings.manifest_cache_max_age))
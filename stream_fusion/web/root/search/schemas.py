@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from stream_fusion.web.cache_hints import CacheHints
+
 class Stream(BaseModel):
     name: str
     description: str
@@ -9,5 +11,5 @@ class Stream(BaseModel):
     fileIdx: Optional[int] = None
     behaviorHints: dict = Field(default_factory=dict)
 
-class SearchResponse(BaseModel):
+class SearchResponse(CacheHints):
     streams: List[Stream]
\ No newline at end of file
@@ -1,12 +1,11 @@
 import json
 import queue
-import re
 import threading
 from typing import List
 
-from RTN import ParsedData
+from stream_fusion.utils.torrent.compact_parsed_data import CompactParsedData
 
-from stream_fusion.constants import FR_RELEASE_GROUPS, FRENCH_PATTERNS
+from stream_fusion.utils.parser.title_classifier import classify_title
 from stream_fusion.utils.models.media import Media
 from stream_fusion.utils.torrent.torrent_item import TorrentItem
 from stream_fusion.utils.string_encoding import encodeb64
@@ -50,17 +49,11 @@ def filter_by_direct_torrnet(item):
 
 
 def extract_release_group(title):
-    combined_pattern = "|".join(FR_RELEASE_GROUPS)
-    match = re.search(combined_pattern, title)
-    return match.group(0) if match else None
+    return classify_title(title).release_group
 
 
 def detect_french_language(title):
-    for language, pattern in FRENCH_PATTERNS.items():
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            return language
-    return None
+    return classify_title(title).french_variant
 
 
 def _generate_binge_group(torrent_item: TorrentItem, media: Media) -> str:
@@ -95,7 +88,7 @@ def parse_to_debrid_stream(
     else:
         name = f"{DOWNLOAD_REQUIRED}|–DL-|{DOWNLOAD_REQUIRED}"
 
-    parsed_data: ParsedData = torrent_item.parsed_data
+    parsed_data: CompactParsedData = torrent_item.parsed_data
 
     resolution = parsed_data.resolution if parsed_data.resolution else "Unknow"
     name += f"\n |_{resolution}_|"
@@ -1,6 +1,6 @@
 import hashlib
 import time
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from uuid import UUID
 import asyncio
 
@@ -10,7 +10,9 @@ from stream_fusion.services.postgresql.dao.torrentitem_dao import TorrentItemDAO
 from stream_fusion.services.redis.redis_config import get_redis_cache_dependency
 from stream_fusion.utils.cache.cache import search_public
 from stream_fusion.utils.cache.local_redis import RedisCache
+from stream_fusion.utils.debrid.availability import check_availability
 from stream_fusion.utils.debrid.get_debrid_service import get_all_debrid_services
+from stream_fusion.utils.debrid.rate_limit import QuotaLow, low_priority
 from stream_fusion.utils.filter.results_per_quality_filter import (
     ResultsPerQualityFilter,
 )
@@ -23,17 +25,27 @@ from stream_fusion.logging_config import logger
 from stream_fusion.utils.jackett.jackett_result import JackettResult
 from stream_fusion.utils.jackett.jackett_service import JackettService
 from stream_fusion.utils.parser.parser_service import StreamParser
+from stream_fusion.utils.parser.title_parser import title_parse_service
 from stream_fusion.utils.sharewood.sharewood_service import SharewoodService
 from stream_fusion.utils.yggfilx.yggflix_service import YggflixService
 from stream_fusion.utils.metdata.cinemeta import Cinemeta
 from stream_fusion.utils.metdata.tmdb import TMDB
 from stream_fusion.utils.models.movie import Movie
 from stream_fusion.utils.models.series import Series
-from stream_fusion.utils.parse_config import parse_config
+from stream_fusion.utils.config_profiles import resolve_config
 from stream_fusion.utils.security.security_api_key import check_api_key
 from stream_fusion.utils.torrent.torrent_item import TorrentItem
 from stream_fusion.web.root.search.schemas import SearchResponse, Stream
 from stream_fusion.web.root.search.stremio_parser import parse_to_stremio_streams
+from stream_fusion.web.cache_hints import cache_control, cache_hints, cached_payload_response
+from stream_fusion.web.disconnect import cancel_on_disconnect, shield_from_disconnect
+from stream_fusion.web.encoded_response import (
+    ENCODED_KEY_SUFFIX,
+    EncodedPayload,
+    encoded_response,
+    load_payload,
+    store_payload,
+)
 from stream_fusion.utils.torrent.torrent_service import TorrentService
 from stream_fusion.utils.torrent.torrent_smart_container import TorrentSmartContainer
 from stream_fusion.utils.zilean.zilean_result import ZileanResult
@@ -44,8 +56,31 @@ from stream_fusion.settings import settings
 router = APIRouter()
 
 
+async def cache_streams(redis_cache, cache_key, streams, expiration):
+    """Caches the rendered, precompressed response body of the streams"""
+    payload = EncodedPayload.from_model(SearchResponse(streams=streams, **cache_hints(expiration, stale_if_error=False)))
+    await store_payload(await redis_cache.get_redis_client(), cache_key, payload, expiration)
+    return payload
+
+
+async def load_cached_streams(redis_cache, cache_key):
+    """Cached response body, None on a cache miss"""
+    return await load_payload(await redis_cache.get_redis_client(), cache_key)
+
+
+async def has_cached_streams(redis_cache, cache_key):
+    client = await redis_cache.get_redis_client()
+    return bool(await client.exists(cache_key + ENCODED_KEY_SUFFIX))
+
+
 async def full_prefetch_from_cache(media, config, redis_cache, stream_cache_key, get_metadata, stream_type, debrid_services, torrent_dao, request):
     """Pre-fetch complet de l'épisode suivant en arrière-plan"""
+    # Le pre-fetch laisse la place aux requêtes des utilisateurs quand le quota debrid s'épuise
+    with low_priority() as work:
+        await _full_prefetch_from_cache(work, media, config, redis_cache, stream_cache_key, get_metadata, stream_type, debrid_services, request)
+
+
+async def _full_prefetch_from_cache(work, media, config, redis_cache, stream_cache_key, get_metadata, stream_type, debrid_services, request):
     try:
         # Petit délai pour ne pas surcharger immédiatement après la recherche principale
         await asyncio.sleep(1.0)
@@ -66,9 +101,7 @@ async def full_prefetch_from_cache(media, config, redis_cache, stream_cache_key,
         )
         
         next_stream_key = stream_cache_key(next_media_mock)
-        cached_next = await redis_cache.get(next_stream_key)
-        
-        if cached_next is None:
+        if not await has_cached_streams(redis_cache, next_stream_key):
             logger.debug(f"Pre-fetch: Starting full background search for next episode {next_episode_id}")
             
             next_media = await asyncio.wait_for(
@@ -112,37 +145,49 @@ async def full_prefetch_from_cache(media, config, redis_cache, stream_cache_key,
                     torrent_smart_container = TorrentSmartContainer(filtered_results, next_media)
                     
                     # Vérifier la disponibilité
-                    for debrid in debrid_services:
-                        hashes = torrent_smart_container.get_unaviable_hashes()
-                        ip = request.client.host
-                        result = debrid.get_availability_bulk(hashes, ip)
-                        if result:
-                            torrent_smart_container.update_availability(result, type(debrid), next_media)
+                    max_results = int(config["maxResults"])
+                    shortlists = torrent_smart_container.get_availability_shortlists(
+                        config["sort"], settings.availability_shortlist_factor * max_results
+                    )
+                    for shortlist in shortlists:
+                        await check_availability(
+                            debrid_services, torrent_smart_container, shortlist, next_media, request.client.host
+                        )
+                        if torrent_smart_container.count_available() >= max_results:
+                            break
+
+                    if work.yielded:
+                        logger.debug(f"Pre-fetch: Debrid quota running low, episode {next_episode_id} not cached")
+                        return
                     
                     # Cache et génération des streams
                     if config["cache"]:
                         torrent_smart_container.cache_container_items()
                     
                     best_matching_results = torrent_smart_container.get_best_matching()
-                    best_matching_results = sort_items(best_matching_results, config)
+                    best_matching_results = sort_items(best_matching_results, config, limit=int(config["maxResults"]))
                     
                     parser = StreamParser(config)
                     stream_list = parser.parse_to_stremio_streams(best_matching_results, next_media)
+                    await parser.store_playback_tokens(stream_list, redis_cache)
                     next_stream_objects = [Stream(**stream) for stream in stream_list]
                     
                     # Mettre en cache les résultats
-                    await redis_cache.set(stream_cache_key(next_media), next_stream_objects, expiration=1200)
+                    await cache_streams(redis_cache, stream_cache_key(next_media), next_stream_objects, 1200)
                     logger.success(f"Pre-fetch: Successfully background pre-cached {len(next_stream_objects)} streams for episode {next_episode_id}")
                 else:
                     logger.debug(f"Pre-fetch: No results found for episode {next_episode_id}")
                     
             finally:
+                await title_parse_service.flush()
                 await background_session.commit()
                 await background_session.close()
                 
         else:
             logger.debug(f"Pre-fetch: Next episode {next_episode_id} already cached")
             
+    except QuotaLow as e:
+        logger.debug(f"Pre-fetch: Debrid quota running low on {e}, pre-fetch skipped")
     except Exception as e:
         logger.debug(f"Pre-fetch: Error during full background pre-fetch: {str(e)}")
 
@@ -168,9 +213,7 @@ async def simple_prefetch_next_episode(media, config, redis_cache, stream_cache_
         )
         
         next_stream_key = stream_cache_key(next_media_mock)
-        cached_next = await redis_cache.get(next_stream_key)
-        
-        if cached_next is None:
+        if not await has_cached_streams(redis_cache, next_stream_key):
             logger.debug(f"Pre-fetch: Starting simple background search for next episode {next_episode_id}")
             
             await asyncio.wait_for(
@@ -207,9 +250,7 @@ async def prefetch_next_episode(media, config, redis_cache, stream_cache_key, ge
         )
         
         next_stream_key = stream_cache_key(next_media_mock)
-        cached_next = await redis_cache.get(next_stream_key)
-        
-        if cached_next is None:
+        if not await has_cached_streams(redis_cache, next_stream_key):
             logger.info(f"Pre-fetch: Starting background search for next episode {next_episode_id}")
             
             expiration_time = 1200
@@ -224,10 +265,10 @@ async def prefetch_next_episode(media, config, redis_cache, stream_cache_key, ge
                 timeout=12.0
             )
             filtered_results = ResultsPerQualityFilter(config).filter(raw_results)
-            next_streams = stream_processing(filtered_results, next_media, config)
+            next_streams = await stream_processing(filtered_results, next_media, config)
             next_stream_objects = [Stream(**stream) for stream in next_streams]
             
-            await redis_cache.set(stream_cache_key(next_media), next_stream_objects, expiration=expiration_time)
+            await cache_streams(redis_cache, stream_cache_key(next_media), next_stream_objects, expiration_time)
             logger.success(f"Pre-fetch: Successfully background pre-cached {len(next_stream_objects)} streams for episode {next_episode_id}")
             
         else:
@@ -253,14 +294,29 @@ async def get_results(
     redis_cache: RedisCache = Depends(get_redis_cache_dependency),
     apikey_dao: APIKeyDAO = Depends(),
     torrent_dao: TorrentItemDAO = Depends(),
-) -> SearchResponse:
+) -> Response:
+    # Stremio drops stream requests as soon as the user backs out
+    return await cancel_on_disconnect(
+        request,
+        search_streams(request, config, stream_type, stream_id, redis_cache, apikey_dao, torrent_dao),
+    )
+
+
+async def search_streams(
+    request: Request,
+    config: str,
+    stream_type: str,
+    stream_id: str,
+    redis_cache: RedisCache,
+    apikey_dao: APIKeyDAO,
+    torrent_dao: TorrentItemDAO,
+) -> Response:
     start = time.time()
     logger.info(f"Search: Stream request initiated for {stream_type} - {stream_id}")
 
     stream_id = stream_id.replace(".json", "")
-    config = parse_config(config)
+    config = await resolve_config(config, request)
     api_key = config.get("apiKey")
-    ip_address = request.client.host
     # Only validate the API key if it exists
     if api_key:
         await check_api_key(api_key, apikey_dao)
@@ -290,7 +346,8 @@ async def get_results(
     logger.debug(f"Search: Retrieved media metadata for {str(media.titles)}")
 
     def stream_cache_key(media):
-        cache_user_identifier = api_key if api_key else ip_address
+        # Same config, same results: every device of a profile shares them
+        cache_user_identifier = config.fingerprint
         if isinstance(media, Movie):
             key_string = f"stream:{cache_user_identifier}:{media.titles[0]}:{media.year}:{media.languages[0]}"
         elif isinstance(media, Series):
@@ -303,17 +360,17 @@ async def get_results(
         hashed_key = hashlib.sha256(key_string.encode("utf-8")).hexdigest()
         return hashed_key[:16]
 
-    cached_result = await redis_cache.get(stream_cache_key(media))
-    if cached_result is not None:
+    cached_payload = await load_cached_streams(redis_cache, stream_cache_key(media))
+    if cached_payload is not None:
         logger.info("Search: Returning cached processed results")
         
         if isinstance(media, Series):
             asyncio.create_task(full_prefetch_from_cache(media, config, redis_cache, stream_cache_key, get_metadata, stream_type, debrid_services, torrent_dao, request))
-            await asyncio.sleep(0.5)  # 500ms de délai pour les séries
             
         total_time = time.time() - start
         logger.success(f"Search: Request completed in {total_time:.2f} seconds")
-        return SearchResponse(streams=cached_result)
+        # Streams carry per-user playback links, only valid until their token expires
+        return cached_payload_response(request, cached_payload, stale_if_error=False)
 
     def media_cache_key(media):
         if isinstance(media, Movie):
@@ -339,6 +396,9 @@ async def get_results(
                     logger.success(
                         f"Search: Found {len(public_cached_results)} public cached results"
                     )
+                    await title_parse_service.warm(
+                        torrent.get("title") for torrent in public_cached_results if isinstance(torrent, dict)
+                    )
                     public_cached_results = [
                         JackettResult().from_cached_item(torrent, media)
                         for torrent in public_cached_results
@@ -360,6 +420,9 @@ async def get_results(
                     logger.success(
                         f"Search: Found {len(zilean_search_results)} results from Zilean"
                     )
+                    await title_parse_service.warm(
+                        getattr(torrent, "raw_title", None) for torrent in zilean_search_results
+                    )
                     zilean_search_results = [
                         ZileanResult().from_api_cached_item(torrent, media)
                         for torrent in zilean_search_results
@@ -445,7 +508,10 @@ async def get_results(
                 except Exception as e:
                     logger.error(f"Search: Error updating cache: {e}")
 
-        await perform_search()
+        try:
+            await perform_search()
+        finally:
+            await shield_from_disconnect(request, title_parse_service.flush())
         return search_results
 
     async def get_and_filter_results(media, config):
@@ -457,11 +523,13 @@ async def get_results(
             logger.debug("Search: No results in cache. Performing new search.")
             nocache_results = await get_search_results(media, config)
             nocache_results_dict = [item.to_dict() for item in nocache_results]
-            await redis_cache.set(cache_key, nocache_results_dict, expiration=settings.redis_expiration)
+            await shield_from_disconnect(
+                request, redis_cache.set(cache_key, nocache_results_dict, expiration=settings.redis_expiration)
+            )
             logger.info(
                 f"Search: New search completed, found {len(nocache_results)} results"
             )
-            return nocache_results
+            return ResultsPerQualityFilter(config).filter(nocache_results)
         else:
             logger.info(
                 f"Search: Retrieved {len(unfiltered_results)} results from redis cache"
@@ -470,7 +538,8 @@ async def get_results(
                 TorrentItem.from_dict(item) for item in unfiltered_results
             ]
 
-        filtered_results = filter_items(unfiltered_results, media, config=config)
+        # Ranking is left to ResultsPerQualityFilter.rank(), which only keeps the best items
+        filtered_results = filter_items(unfiltered_results, media, config=config, sort=False)
 
         if len(filtered_results) < min_results:
             logger.info(
@@ -479,64 +548,52 @@ async def get_results(
             await redis_cache.delete(cache_key)
             unfiltered_results = await get_search_results(media, config)
             unfiltered_results_dict = [item.to_dict() for item in unfiltered_results]
-            await redis_cache.set(cache_key, unfiltered_results_dict, expiration=settings.redis_expiration)
-            filtered_results = filter_items(unfiltered_results, media, config=config)
+            await shield_from_disconnect(
+                request, redis_cache.set(cache_key, unfiltered_results_dict, expiration=settings.redis_expiration)
+            )
+            filtered_results = filter_items(unfiltered_results, media, config=config, sort=False)
 
         logger.success(
             f"Search: Final number of filtered results: {len(filtered_results)}"
         )
-        return filtered_results
+        return ResultsPerQualityFilter(config).rank(filtered_results)
 
-    raw_search_results = await get_and_filter_results(media, config)
-    logger.debug(f"Search: Filtered search results: {len(raw_search_results)}")
-    search_results = ResultsPerQualityFilter(config).filter(raw_search_results)
+    search_results = await get_and_filter_results(media, config)
     logger.info(f"Search: Filtered search results per quality: {len(search_results)}")
 
-    def stream_processing(search_results, media, config):
+    async def stream_processing(search_results, media, config):
         torrent_smart_container = TorrentSmartContainer(search_results, media)
 
         if config["debrid"]:
-            for debrid in debrid_services:
-                hashes = torrent_smart_container.get_unaviable_hashes()
-                ip = request.client.host
-                result = debrid.get_availability_bulk(hashes, ip)
-                if result:
-                    torrent_smart_container.update_availability(
-                        result, type(debrid), media
-                    )
-                    # Gérer à la fois les dictionnaires et les listes
-                    if isinstance(result, dict):
-                        count = len(result.items())
-                    else:  # Si c'est une liste (comme pour StremThru)
-                        count = len(result)
-                    
-                    # Déterminer si c'est StremThru pour ajuster la durée du cache
-                    is_stremthru = (type(debrid).__name__ == "StremThru" or 
-                                   hasattr(debrid, 'store_name') and getattr(debrid, 'store_name', None) is not None)
-                    
-                    logger.info(
-                        f"Search: Checked availability for {count} items with {type(debrid).__name__}"
-                    )
-                else:
-                    logger.warning(
-                        "Search: No availability results found in debrid service"
-                    )
+            max_results = int(config["maxResults"])
+            shortlists = torrent_smart_container.get_availability_shortlists(
+                config["sort"], settings.availability_shortlist_factor * max_results
+            )
+            for shortlist in shortlists:
+                await check_availability(
+                    debrid_services, torrent_smart_container, shortlist, media, request.client.host
+                )
+
+                # Only widen the shortlist when too few cached results came back
+                if torrent_smart_container.count_available() >= max_results:
+                    break
 
         if config["cache"]:
             logger.info("Search: Caching public container items")
             torrent_smart_container.cache_container_items()
 
         best_matching_results = torrent_smart_container.get_best_matching()
-        best_matching_results = sort_items(best_matching_results, config)
+        best_matching_results = sort_items(best_matching_results, config, limit=int(config["maxResults"]))
         logger.info(f"Search: Found {len(best_matching_results)} best matching results")
 
         parser = StreamParser(config)
         stream_list = parser.parse_to_stremio_streams(best_matching_results, media)
+        await parser.store_playback_tokens(stream_list, redis_cache)
         logger.success(f"Search: Processed {len(stream_list)} streams for Stremio")
 
         return stream_list
 
-    stream_list = stream_processing(search_results, media, config)
+    stream_list = await stream_processing(search_results, media, config)
     streams = [Stream(**stream) for stream in stream_list]
     
     # Définir la durée d'expiration par défaut à 1200 secondes
@@ -554,8 +611,10 @@ async def get_results(
         expiration_time = 600
         logger.info(f"Search: Using reduced cache expiration time of {expiration_time} seconds for StremThru")
     
-    # Mettre en cache les résultats IMMÉDIATEMENT
-    await redis_cache.set(stream_cache_key(media), streams, expiration=expiration_time)
+    # Mettre en cache les résultats IMMÉDIATEMENT, même si le client est parti
+    payload = await shield_from_disconnect(
+        request, cache_streams(redis_cache, stream_cache_key(media), streams, expiration_time)
+    )
     
     # Pre-fetch complet de l'épisode suivant en arrière-plan (non-bloquant)
     if isinstance(media, Series):
@@ -565,4 +624,4 @@ async def get_results(
     
     total_time = time.time() - start
     logger.info(f"Search: Request completed in {total_time:.2f} seconds")
-    return SearchResponse(streams=streams)
+    return encoded_response(request, payload, cache_control(payload.max_age(), stale_if_error=False))
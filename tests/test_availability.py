@@ -0,0 +1,119 @@
+import asyncio
+import gc
+from types import SimpleNamespace
+
+import pytest
+
+from stream_fusion.utils.debrid.availability import AvailabilityBatcher, check_availability, get_batcher
+from stream_fusion.utils.debrid.premiumize import Premiumize
+from stream_fusion.utils.debrid.realdebrid import RealDebrid
+from stream_fusion.utils.torrent.torrent_item import TorrentItem
+from stream_fusion.utils.torrent.torrent_smart_container import TorrentSmartContainer
+
+HASH_A = "a" * 40
+HASH_B = "b" * 40
+
+MEDIA = SimpleNamespace(season=None, episode=None)
+
+
+def make_container():
+    items = [
+        TorrentItem(f"Movie {info_hash[0]} 1080p", 1000, None, info_hash, None, 10, ["fr"], "Jackett", "public", type="movie")
+        for info_hash in (HASH_A, HASH_B)
+    ]
+    return TorrentSmartContainer(items, MEDIA), {item.info_hash: item for item in items}
+
+
+def fake_service(debrid_type, response, delay):
+    # Bypasses __init__, only the type and the availability call matter here
+    service = debrid_type.__new__(debrid_type)
+
+    async def get_availability_bulk_async(hashes_or_magnets, ip=None):
+        await asyncio.sleep(delay)
+        return response
+
+    service.get_availability_bulk_async = get_availability_bulk_async
+    return service
+
+
+# RealDebrid has A cached, Premiumize reports A as not cached and B as cached
+REALDEBRID_RESPONSE = {HASH_A: {"rd": [{"1": {"filename": "movie.a.mkv", "filesize": 900}}]}}
+PREMIUMIZE_RESPONSE = {
+    HASH_A: {"transcoded": False},
+    HASH_B: {"transcoded": True, "filename": "movie.b.mkv", "filesize": 800},
+}
+
+
+@pytest.mark.parametrize("realdebrid_delay, premiumize_delay", [(0.01, 0.05), (0.05, 0.01)])
+def test_answers_merge_in_service_order_whatever_their_arrival(realdebrid_delay, premiumize_delay):
+    container, items = make_container()
+    services = [
+        fake_service(RealDebrid, REALDEBRID_RESPONSE, realdebrid_delay),
+        fake_service(Premiumize, PREMIUMIZE_RESPONSE, premiumize_delay),
+    ]
+
+    asyncio.run(check_availability(services, container, None, MEDIA))
+
+    assert items[HASH_A].availability == "RD"
+    assert items[HASH_A].file_name == "movie.a.mkv"
+    assert items[HASH_B].availability == "PM"
+    assert items[HASH_B].file_name == "movie.b.mkv"
+
+
+def test_later_service_does_not_overwrite_available_items():
+    container, items = make_container()
+    container.update_availability(REALDEBRID_RESPONSE, RealDebrid, MEDIA)
+    cached_on_premiumize = {HASH_A: {"transcoded": True, "filename": "other.mkv", "filesize": 700}}
+
+    container.update_availability(PREMIUMIZE_RESPONSE, Premiumize, MEDIA)
+    container.update_availability(cached_on_premiumize, Premiumize, MEDIA)
+
+    assert items[HASH_A].availability == "RD"
+    assert items[HASH_A].file_name == "movie.a.mkv"
+    assert items[HASH_A].size == 900
+
+
+def test_failing_service_keeps_the_others_results():
+    container, items = make_container()
+
+    async def failing(hashes_or_magnets, ip=None):
+        raise RuntimeError("unreachable")
+
+    broken = fake_service(RealDebrid, None, 0)
+    broken.get_availability_bulk_async = failing
+    services = [broken, fake_service(Premiumize, PREMIUMIZE_RESPONSE, 0.01)]
+
+    asyncio.run(check_availability(services, container, None, MEDIA))
+
+    assert items[HASH_A].availability is False
+    assert items[HASH_B].availability == "PM"
+
+
+def test_batchers_are_per_client_ip():
+    assert get_batcher("StremThru-realdebrid", "account", "1.1.1.1") is get_batcher("StremThru-realdebrid", "account", "1.1.1.1")
+    assert get_batcher("StremThru-realdebrid", "account", "1.1.1.1") is not get_batcher("StremThru-realdebrid", "account", "2.2.2.2")
+
+
+def test_batch_failing_after_every_request_left_is_not_reported():
+    errors = []
+
+    async def ignores_cancellation(hashes):
+        try:
+            await asyncio.sleep(1)
+        finally:
+            raise RuntimeError("unreachable")
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context["message"]))
+        batcher = AvailabilityBatcher("test", 0.01)
+        request = asyncio.ensure_future(batcher.check([HASH_A], ignores_cancellation))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        await asyncio.gather(request, return_exceptions=True)
+        del request
+        await asyncio.sleep(0.01)
+        gc.collect()
+
+    asyncio.run(main())
+
+    assert errors == []